@@ -0,0 +1,260 @@
+import logging
+from datetime import date
+import streaks
+
+# Achievement definitions. The engine evaluates every criteria type in
+# COUNTER_FIELDS on the server; others (like plants_added) are still
+# reported by the client.
+ACHIEVEMENTS = [
+    {
+        'id': 'first_plant',
+        'name': 'Green Thumb',
+        'description': 'Add your first plant to the garden',
+        'icon': 'seedling',
+        'xpReward': 50,
+        'criteria': {'type': 'plants_added', 'threshold': 1}
+    },
+    {
+        'id': 'plant_collector',
+        'name': 'Plant Collector',
+        'description': 'Add 5 different plants to your garden',
+        'icon': 'leaf',
+        'xpReward': 100,
+        'criteria': {'type': 'plants_added', 'threshold': 5}
+    },
+    {
+        'id': 'watering_routine',
+        'name': 'Watering Routine',
+        'description': 'Water your plants 10 times',
+        'icon': 'tint',
+        'xpReward': 75,
+        'criteria': {'type': 'watering_count', 'threshold': 10}
+    },
+    {
+        'id': 'growth_spurt',
+        'name': 'Growth Spurt',
+        'description': 'Help your plants grow 5 stages',
+        'icon': 'seedling',
+        'xpReward': 100,
+        'criteria': {'type': 'plants_grown', 'threshold': 5}
+    },
+    {
+        'id': 'full_bloom',
+        'name': 'Full Bloom',
+        'description': 'Have a plant reach its final growth stage',
+        'icon': 'spa',
+        'xpReward': 300,
+        'criteria': {'type': 'plant_max_growth', 'threshold': 1}
+    },
+    {
+        'id': 'self_care_logger',
+        'name': 'Self-Care Logger',
+        'description': 'Log 25 conditions',
+        'icon': 'clipboard-list',
+        'xpReward': 100,
+        'criteria': {'type': 'conditions_logged', 'threshold': 25}
+    },
+    {
+        'id': 'streak_week',
+        'name': 'Consistency is Key',
+        'description': 'Maintain a 7-day streak',
+        'icon': 'calendar-check',
+        'xpReward': 150,
+        'criteria': {'type': 'max_streak', 'threshold': 7}
+    },
+    {
+        'id': 'streak_month',
+        'name': 'Habit Master',
+        'description': 'Maintain a 30-day streak',
+        'icon': 'trophy',
+        'xpReward': 500,
+        'criteria': {'type': 'max_streak', 'threshold': 30}
+    },
+    {
+        'id': 'social_sprout',
+        'name': 'Social Sprout',
+        'description': 'Make 3 friends',
+        'icon': 'user-friends',
+        'xpReward': 100,
+        'criteria': {'type': 'friends', 'threshold': 3}
+    },
+    {
+        'id': 'blooming_garden',
+        'name': 'Blooming Garden',
+        'description': 'Reach a garden score of 1000',
+        'icon': 'star',
+        'xpReward': 200,
+        'criteria': {'type': 'garden_score', 'threshold': 1000}
+    },
+    {
+        'id': 'level_5',
+        'name': 'Growing Up',
+        'description': 'Reach level 5',
+        'icon': 'arrow-up',
+        'xpReward': 200,
+        'criteria': {'type': 'level', 'threshold': 5}
+    }
+]
+
+# User data field holding the counter of each criteria type evaluated by the engine
+COUNTER_FIELDS = {
+    'watering_count': 'wateringCount',
+    'plants_grown': 'plantsGrown',
+    'plant_max_growth': 'plantsAtMaxGrowth',
+    'conditions_logged': 'conditionsLogged',
+    'max_streak': 'maxStreak',
+    'friends': 'friendCount',
+    'garden_score': 'gardenScore',
+    'level': 'level',
+}
+
+# activityHistory entry holding the days the user watered or logged a condition
+GARDEN_ACTIVITY = 'garden'
+
+# Criteria type -> achievements using it, lowest threshold first
+ACHIEVEMENTS_BY_TYPE = {}
+for achievement in ACHIEVEMENTS:
+    ACHIEVEMENTS_BY_TYPE.setdefault(achievement['criteria']['type'], []).append(achievement)
+for type_achievements in ACHIEVEMENTS_BY_TYPE.values():
+    type_achievements.sort(key=lambda a: a['criteria']['threshold'])
+
+def is_server_evaluated(achievement_id):
+    """Check if an achievement is unlocked by the engine rather than reported by the client"""
+    achievement = next((a for a in ACHIEVEMENTS if a['id'] == achievement_id), None)
+    return achievement is not None and achievement['criteria']['type'] in COUNTER_FIELDS
+
+def increment(user_data, criteria_type, amount=1):
+    field = COUNTER_FIELDS[criteria_type]
+    user_data[field] = user_data.get(field, 0) + amount
+    return {criteria_type}
+
+def set_gauge(user_data, criteria_type, value):
+    # For values kept elsewhere (score, level), only the latest one matters
+    field = COUNTER_FIELDS[criteria_type]
+    if value is None or user_data.get(field) == value:
+        return set()
+    user_data[field] = value
+    return {criteria_type}
+
+def record_activity(user_data, day):
+    """Mark a day (an ISO date) as active and update the longest activity streak
+
+    The days are kept in the same bitmaps as other activity streaks (see
+    streaks.py), so days recorded out of order are counted correctly.
+    """
+    history = user_data.setdefault('activityHistory', {}).setdefault(GARDEN_ACTIVITY, {})
+    streaks.set_day(history, date.fromisoformat(day))
+    user_data.pop('activityStreak', None)  # Kept by earlier versions
+
+    longest = streaks.longest_streak(history)
+    if longest <= user_data.get('maxStreak', 0):
+        return set()
+    return set_gauge(user_data, 'max_streak', longest)
+
+def record_growth(user_data, data):
+    # Number of plants that advanced a stage, and of those that reached the final one
+    changed = set()
+    if data.get('stage_advanced'):
+        changed |= increment(user_data, 'plants_grown', int(data['stage_advanced']))
+    if data.get('max_growth'):
+        changed |= increment(user_data, 'plant_max_growth', int(data['max_growth']))
+    return changed
+
+def on_plant_watered(user_data, data):
+    changed = increment(user_data, 'watering_count')
+    changed |= record_growth(user_data, data)
+    changed |= record_activity(user_data, data['day'])
+    changed |= set_gauge(user_data, 'garden_score', data.get('garden_score'))
+    return changed
+
+def on_condition_logged(user_data, data):
+    changed = increment(user_data, 'conditions_logged')
+    changed |= record_growth(user_data, data)
+    changed |= record_activity(user_data, data['day'])
+    changed |= set_gauge(user_data, 'garden_score', data.get('garden_score'))
+    return changed
+
+def on_friends_changed(user_data, data):
+    # The current count, so removing and re-adding a friend doesn't count twice
+    changed = set_gauge(user_data, 'friends', data['friend_count'])
+    changed |= set_gauge(user_data, 'garden_score', data.get('garden_score'))
+    return changed
+
+def on_xp_awarded(user_data, data):
+    # The level is kept in the user data itself, just check it
+    return {'level'}
+
+# Event name -> handler updating the counters it affects and returning their criteria types
+EVENT_HANDLERS = {
+    'plant_watered': on_plant_watered,
+    'condition_logged': on_condition_logged,
+    'friends_changed': on_friends_changed,
+    'xp_awarded': on_xp_awarded,
+}
+
+def evaluate(user_data, changed):
+    """Unlock the achievements of the changed criteria types whose threshold is met
+
+    Only achievements of the changed types are checked, each against its
+    counter, so the cost doesn't depend on the user's history.
+
+    Returns:
+        The newly unlocked achievements
+    """
+    unlocked = []
+    while changed:
+        criteria_type = changed.pop()
+        value = user_data.get(COUNTER_FIELDS[criteria_type], 0)
+        for achievement in ACHIEVEMENTS_BY_TYPE.get(criteria_type, ()):
+            if achievement['criteria']['threshold'] > value:
+                break
+            if achievement['id'] in user_data['achievements']:
+                continue
+            user_data['achievements'].append(achievement['id'])
+            unlocked.append(achievement)
+
+            # The XP reward can level the user up
+            reward = achievement.get('xpReward', 0)
+            user_data['xp'] += reward
+            user_data['totalXp'] += reward
+            new_level = 1 + user_data['totalXp'] // 100
+            if new_level > user_data['level']:
+                user_data['level'] = new_level
+                changed.add('level')
+    return unlocked
+
+def apply_event(user_data, event, data):
+    """Update a user's counters for an event and unlock the achievements it completes"""
+    changed = EVENT_HANDLERS[event](user_data, data)
+    return evaluate(user_data, changed)
+
+def record_event(user_id, event, data=None):
+    """Feed a domain event to the achievement engine
+
+    Updates the user's advanced data in the shared store and publishes
+    newly unlocked achievements to the user's garden stream. Errors are
+    logged, never raised, so a write that already happened isn't reported
+    as failed.
+
+    Args:
+        user_id: The user the event happened to
+        event: The event name, a key of EVENT_HANDLERS
+        data: Event details, e.g. the day, the new garden score and the
+            number of plants that advanced a stage
+    """
+    from routes_advanced import update_user_data
+    from garden_events import publish_achievement
+
+    data = dict(data or {})
+    data.setdefault('day', date.today().isoformat())
+    unlocked = []
+    try:
+        update_user_data(str(user_id), lambda user_data: unlocked.extend(apply_event(user_data, event, data)))
+    except Exception as e:
+        logging.error(f"Error recording achievement event {event}: {str(e)}")
+        return []
+
+    for achievement in unlocked:
+        logging.info(f"User {user_id} unlocked achievement {achievement['id']}")
+        publish_achievement(user_id, achievement)
+    return unlocked
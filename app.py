@@ -1,23 +1,37 @@
 import os
+import sys
 import logging
 import secrets
 import time
 from datetime import timedelta
 from flask import Flask, request, g
+from flask.helpers import get_debug_flag
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-# Set up logging with more detailed format
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+# Set up non-blocking logging (JSON in production, text in debug mode)
+from logging_config import configure_logging, REQUEST_LOGGER_NAME
+configure_logging(debug=get_debug_flag())
+request_logger = logging.getLogger(REQUEST_LOGGER_NAME)
+
+# Under gunicorn's gevent worker, make psycopg2 wait for Postgres cooperatively
+# so a query only blocks its own request instead of every request and stream
+# of the worker
+if 'gevent' in sys.modules:
+    from gevent import monkey
+    if monkey.is_module_patched('socket'):
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            logging.warning("psycogreen is not installed, Postgres queries will block the gevent worker")
 
 # Create SQLAlchemy instance with older style configuration
-db = SQLAlchemy()
+# (the routing session sends plain reads to a read pool when one is configured)
+from db_routing import RoutingSession
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 # Function to generate a secure secret key
 def generate_secret_key():
@@ -90,6 +104,8 @@ app.config.update(
     SESSION_COOKIE_SAMESITE='Lax',
     PERMANENT_SESSION_LIFETIME=timedelta(days=7),  # Session expires after 7 days
     MAX_CONTENT_LENGTH=16 * 1024 * 1024,  # 16MB max upload size
+    # "memory" keeps rate limit buckets per worker, "sqlite:///path" shares them between workers
+    RATE_LIMIT_STORAGE=os.environ.get("RATE_LIMIT_STORAGE", "memory"),
 )
 
 # Security headers middleware
@@ -115,18 +131,30 @@ def add_security_headers(response):
     
     return response
 
-# Request logging middleware
+# Request logging middleware (sampled, see LOG_REQUEST_SAMPLE_RATE)
 @app.before_request
 def log_request_info():
     if request.path.startswith('/api/'):
-        logging.debug(f"Request: {request.method} {request.path} from {request.remote_addr}")
-        g.request_start_time = time.time()
+        g.request_start_time = time.perf_counter()
 
 @app.after_request
 def log_response_info(response):
     if hasattr(g, 'request_start_time') and request.path.startswith('/api/'):
-        duration = time.time() - g.request_start_time
-        logging.debug(f"Response: {response.status_code} in {duration:.4f}s")
+        # Server errors are always logged, other requests are sampled
+        level = logging.WARNING if response.status_code >= 500 else logging.INFO
+        if request_logger.isEnabledFor(level):
+            duration = time.perf_counter() - g.request_start_time
+            request_logger.log(
+                level,
+                "%s %s %s in %.4fs", request.method, request.path, response.status_code, duration,
+                extra={
+                    'method': request.method,
+                    'path': request.path,
+                    'status': response.status_code,
+                    'duration_ms': round(duration * 1000, 2),
+                    'remote_addr': request.remote_addr
+                }
+            )
     return response
 
 # Configure database connection
@@ -144,8 +172,46 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_pre_ping": True,
 }
 
+# SQLite database files get WAL, tuned pragmas and separate read and write pools
+# (set SQLITE_MODE=0 to use a single plain pool instead)
+from sqlite_mode import configure_sqlite, init_sqlite_engines, is_sqlite_file_url
+if is_sqlite_file_url(app.config["SQLALCHEMY_DATABASE_URI"]) and os.environ.get("SQLITE_MODE", "1") != "0":
+    configure_sqlite(app, app.config["SQLALCHEMY_DATABASE_URI"])
+
+# Optional read replicas (comma separated URLs) for views marked with use_replica
+from db_routing import configure_replicas, init_db_routing
+app.config["REPLICA_STICKY_SECONDS"] = float(os.environ.get("REPLICA_STICKY_SECONDS", 5))
+if configure_replicas(app, os.environ.get("DATABASE_REPLICA_URLS")):
+    logging.info("Read replicas configured")
+
 # Initialize SQLAlchemy with Flask app
 db.init_app(app)
+init_sqlite_engines(app, db)
+init_db_routing(app)
+
+# Optional group-commit writer for bursty writes (on by default in SQLite mode)
+from write_queue import init_write_queue
+init_write_queue(app, db)
+
+# Record per-route latency, status and database metrics, exposed at /metrics
+from metrics import init_metrics
+init_metrics(app, db)
+
+# Flag repeated SQL statements (likely N+1 queries) in development and staging
+from query_tracker import init_query_tracker
+init_query_tracker(app)
+
+# Serve bundled, content-hashed static assets (built by build_assets.py)
+from assets import init_assets
+init_assets(app)
+
+# Anonymous page, per-user fragment and Jinja bytecode caching
+from template_cache import init_template_cache
+init_template_cache(app)
+
+# Personalized plant advice, cached per user and refreshed in the background after writes
+from plant_advisor import init_plant_advisor
+init_plant_advisor(app)
 
 # Initialize Flask-Login
 login_manager = LoginManager()
@@ -158,15 +224,12 @@ def load_user(user_id):
     from models import User
     return User.query.get(user_id)
 
-# Initialize Supabase Storage buckets
-try:
-    from supabase_storage import SupabaseStorage
-    SupabaseStorage.initialize_buckets()
-    logging.info("Supabase Storage bucket check completed")
-except Exception as e:
-    logging.error(f"Failed to check Supabase Storage buckets: {str(e)}")
-    logging.warning("Continuing application startup despite storage initialization issues")
-    # We'll continue anyway and handle storage errors at the API level
+# Liveness and readiness endpoints, checked lazily when they are requested
+from health import init_health
+init_health(app, db)
+
+# Supabase Storage buckets are checked by the bootstrap command and lazily
+# on the first upload, so workers start without any network calls
 
 # Import and register blueprints
 try:
@@ -0,0 +1,142 @@
+import json
+import logging
+import mimetypes
+import os
+from flask import current_app, request, send_from_directory, url_for
+
+# Static files combined into each bundle, in load order (paths relative to static/)
+BUNDLES = {
+    'base.css': ['css/dashboard.css', 'css/performance.css'],
+    'base.js': ['js/optimized.js', 'js/api_test.js'],
+    'advanced.js': [
+        'js/interactive_growth.js',
+        'js/ai_plant_advisor.js',
+        'js/plant_3d_visualizer.js',
+        'js/gamification_system.js',
+        'js/advanced_features.js'
+    ],
+    'landing.css': ['css/landing.css'],
+    'auth.css': ['css/auth.css'],
+    'auth_supabase.js': ['js/auth_supabase.js'],
+    'garden.css': ['css/styles.css', 'css/garden.css', 'css/animations.css'],
+    'garden.js': [
+        'svg/plant_stages.js',
+        'svg/enhanced_plants.js',
+        'js/utilities.js',
+        'js/garden_new.js',
+        'js/conditions.js',
+        'js/animations.js'
+    ],
+    'friends.css': ['css/styles.css', 'css/friends.css'],
+    'friends.js': [
+        'svg/plant_stages.js',
+        'svg/enhanced_plants.js',
+        'js/utilities.js',
+        'js/friends.js',
+        'js/animations.js'
+    ],
+    'friends_simple.css': ['css/styles.css'],
+    'profile.css': ['css/profile.css'],
+    'profile.js': ['js/conditions.js', 'js/storage.js']
+}
+
+# Built bundles are written here by build_assets.py
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# Content-hashed files never change, so browsers may cache them for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Precompressed siblings written by build_assets.py, in order of preference
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_manifest = {}
+
+# Which precompressed siblings exist, static files only change with a deploy
+_precompressed_cache = {}
+
+def load_manifest(static_folder):
+    """Load the bundle name to hashed file name mapping written by the build"""
+    manifest_path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        logging.error(f"Error loading asset manifest: {str(e)}")
+        return {}
+
+def asset_urls(bundle):
+    """Get the URLs to include for a bundle
+
+    Returns the single content-hashed bundle when it has been built, and
+    the individual source files otherwise (development, or before the first
+    build).
+    """
+    hashed_name = _manifest.get(bundle)
+    if hashed_name:
+        return [url_for('static', filename=f'{DIST_DIR}/{hashed_name}')]
+    return [url_for('static', filename=filename) for filename in BUNDLES[bundle]]
+
+def find_precompressed(static_folder, filename, cache):
+    """Get the (encoding, suffix) pairs available for a static file"""
+    available = _precompressed_cache.get(filename) if cache else None
+    if available is None:
+        available = tuple(
+            (encoding, suffix) for encoding, suffix in PRECOMPRESSED_ENCODINGS
+            if os.path.isfile(os.path.join(static_folder, filename + suffix))
+        )
+        if cache:
+            _precompressed_cache[filename] = available
+    return available
+
+def send_static_file(filename):
+    """Static view that serves a precompressed sibling when the client accepts it
+
+    The file is sent as-is (with sendfile where the server supports it), so
+    static requests cost no compression CPU.
+    """
+    app = current_app
+    static_folder = app.static_folder
+    available = find_precompressed(static_folder, os.path.normpath(filename), not app.debug)
+
+    for encoding, suffix in available:
+        if request.accept_encodings[encoding]:
+            mimetype, _ = mimetypes.guess_type(filename)
+            response = send_from_directory(
+                static_folder,
+                filename + suffix,
+                mimetype=mimetype or 'application/octet-stream',
+                max_age=app.get_send_file_max_age(filename)
+            )
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = app.send_static_file(filename)
+
+    if available:
+        response.vary.add('Accept-Encoding')
+    return response
+
+def add_immutable_cache_headers(response):
+    if request.path.startswith(f'/static/{DIST_DIR}/') and response.status_code in (200, 304):
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+def init_assets(app):
+    """Make asset_urls() available to templates and cache built bundles forever
+
+    Built bundles are used unless ASSETS_USE_BUNDLES is off, which is the
+    default in debug mode so edits to the source files show up immediately.
+    """
+    global _manifest
+    app.config.setdefault('ASSETS_USE_BUNDLES', not app.debug)
+    _manifest = load_manifest(app.static_folder) if app.config['ASSETS_USE_BUNDLES'] else {}
+
+    app.jinja_env.globals['asset_urls'] = asset_urls
+    app.after_request(add_immutable_cache_headers)
+
+    # Replace Flask's static view with the precompression-aware one
+    app.view_functions['static'] = send_static_file
@@ -0,0 +1,99 @@
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from sqlalchemy import create_engine, text
+from sqlite_mode import setup_sqlite_engine
+
+# Reads done for every write, roughly the mix of the garden API
+READS_PER_WRITE = 4
+
+def create_engines(path, tuned):
+    """Get (write engine, read engine) the way the app would create them"""
+    url = f"sqlite:///{path}"
+    if not tuned:
+        engine = create_engine(url)
+        return engine, engine
+
+    write_engine = create_engine(url, pool_size=1, max_overflow=0)
+    read_engine = create_engine(url, pool_size=5, max_overflow=5)
+    setup_sqlite_engine(write_engine)
+    setup_sqlite_engine(read_engine, read_only=True)
+    return write_engine, read_engine
+
+def prepare_database(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE conditions (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, "
+            "type_name TEXT NOT NULL, value FLOAT NOT NULL, date_logged TIMESTAMP)"
+        ))
+        conn.execute(text("CREATE INDEX ix_conditions_user_id ON conditions (user_id)"))
+    engine.dispose()
+
+def run_worker(path, tuned, duration, users, results):
+    """Simulate one gunicorn worker: mixed reads and writes until the time is up"""
+    write_engine, read_engine = create_engines(path, tuned)
+    reads = writes = errors = 0
+    deadline = time.perf_counter() + duration
+
+    while time.perf_counter() < deadline:
+        user_id = f"user-{random.randrange(users)}"
+        try:
+            with read_engine.connect() as conn:
+                for _ in range(READS_PER_WRITE):
+                    conn.execute(
+                        text("SELECT COUNT(*), AVG(value) FROM conditions WHERE user_id = :user_id"),
+                        {'user_id': user_id}
+                    ).one()
+                    reads += 1
+
+            with write_engine.begin() as conn:
+                conn.execute(
+                    text("INSERT INTO conditions (user_id, type_name, value, date_logged) "
+                         "VALUES (:user_id, 'water_intake', :value, CURRENT_TIMESTAMP)"),
+                    {'user_id': user_id, 'value': random.random() * 8}
+                )
+                writes += 1
+        except Exception:
+            # Usually "database is locked"
+            errors += 1
+
+    results.put((reads, writes, errors))
+
+def benchmark(tuned, workers, duration, users):
+    """Run the workload in several processes and return the totals"""
+    directory = tempfile.mkdtemp(prefix='pixelsprout-bench-')
+    path = os.path.join(directory, 'bench.db')
+    prepare_database(path)
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(path, tuned, duration, users, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    reads, writes, errors = (sum(column) for column in zip(*totals))
+    return {'reads': reads, 'writes': writes, 'errors': errors}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare plain and tuned SQLite under concurrent workers")
+    parser.add_argument('--workers', type=int, default=4, help="Worker processes (default 4)")
+    parser.add_argument('--duration', type=float, default=5.0, help="Seconds per run (default 5)")
+    parser.add_argument('--users', type=int, default=100, help="Distinct users in the workload (default 100)")
+    args = parser.parse_args()
+
+    for label, tuned in (('plain', False), ('sqlite mode', True)):
+        result = benchmark(tuned, args.workers, args.duration, args.users)
+        print(
+            f"{label:>12}: {result['reads'] / args.duration:8.0f} reads/s "
+            f"{result['writes'] / args.duration:8.0f} writes/s "
+            f"{result['errors']:6d} errors"
+        )
@@ -0,0 +1,163 @@
+import logging
+import os
+import sys
+import click
+from app import app, db
+
+# Condition types every garden starts with
+DEFAULT_CONDITION_TYPES = [
+    {
+        'name': 'water_intake',
+        'description': 'Daily water intake in glasses',
+        'unit': 'glasses',
+        'default_goal': 8
+    },
+    {
+        'name': 'focus_time',
+        'description': 'Time spent focusing on tasks',
+        'unit': 'minutes',
+        'default_goal': 120
+    },
+    {
+        'name': 'deep_work',
+        'description': 'Time spent in deep, uninterrupted work',
+        'unit': 'minutes',
+        'default_goal': 90
+    },
+    {
+        'name': 'sunlight',
+        'description': 'Time spent outside in sunlight',
+        'unit': 'minutes',
+        'default_goal': 30
+    },
+    {
+        'name': 'exercise',
+        'description': 'Physical activity time',
+        'unit': 'minutes',
+        'default_goal': 30
+    },
+    {
+        'name': 'meditation',
+        'description': 'Time spent meditating',
+        'unit': 'minutes',
+        'default_goal': 15
+    },
+    {
+        'name': 'reading',
+        'description': 'Time spent reading books',
+        'unit': 'minutes',
+        'default_goal': 30
+    },
+    {
+        'name': 'sleep',
+        'description': 'Hours of sleep',
+        'unit': 'hours',
+        'default_goal': 8
+    },
+    {
+        'name': 'gratitude',
+        'description': 'Number of things you feel grateful for',
+        'unit': 'items',
+        'default_goal': 3
+    },
+    {
+        'name': 'journaling',
+        'description': 'Time spent journaling',
+        'unit': 'minutes',
+        'default_goal': 10
+    },
+    {
+        'name': 'nature_time',
+        'description': 'Time spent in nature',
+        'unit': 'minutes',
+        'default_goal': 30
+    },
+    {
+        'name': 'digital_detox',
+        'description': 'Time spent away from digital devices',
+        'unit': 'minutes',
+        'default_goal': 60
+    }
+]
+
+def seed_condition_types():
+    """Add the default condition types if there are none yet"""
+    from models import ConditionType
+    if ConditionType.query.first():
+        return False
+
+    for condition in DEFAULT_CONDITION_TYPES:
+        db.session.add(ConditionType(
+            id=None,
+            name=condition['name'],
+            description=condition['description'],
+            unit=condition['unit'],
+            default_goal=condition['default_goal']
+        ))
+    db.session.commit()
+    return True
+
+# Columns added to existing tables after their creation, which db.create_all() doesn't add
+ADDED_COLUMNS = [
+    ('users', 'garden_version', 'INTEGER NOT NULL DEFAULT 0'),
+]
+
+def add_missing_columns():
+    """Add the ADDED_COLUMNS a database created by an older version lacks"""
+    from sqlalchemy import inspect, text
+    added = []
+    with db.engine.begin() as conn:
+        # Inspected on the same connection, SQLite mode has a single write connection
+        inspector = inspect(conn)
+        for table, column, definition in ADDED_COLUMNS:
+            if column not in {c['name'] for c in inspector.get_columns(table)}:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+                added.append(f"{table}.{column}")
+    return added
+
+def bootstrap(check_storage=True):
+    """Create tables and seed data once per deploy instead of in every worker
+
+    Runs db.create_all(), adds columns missing from older databases, seeds
+    condition types and plant types and, if check_storage is set, makes sure
+    the Supabase Storage buckets exist.
+    Storage problems are logged but do not fail the bootstrap.
+    """
+    with app.app_context():
+        import models  # noqa: F401 (registers the tables)
+        db.create_all()
+        logging.info("Database tables created")
+
+        for column in add_missing_columns():
+            logging.info(f"Added column {column}")
+
+        if seed_condition_types():
+            logging.info("Default condition types added")
+
+        try:
+            from routes_plants import initialize_plant_types
+            initialize_plant_types()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Error initializing plant types: {str(e)}")
+
+    if check_storage:
+        try:
+            from supabase_storage import SupabaseStorage
+            SupabaseStorage.ensure_buckets()
+            logging.info("Supabase Storage bucket check completed")
+        except Exception as e:
+            logging.warning(f"Skipped Supabase Storage bucket check: {str(e)}")
+
+@app.cli.command('bootstrap')
+@click.option('--skip-storage', is_flag=True, help="Don't check the Supabase Storage buckets")
+def bootstrap_command(skip_storage):
+    """Create tables and seed default data"""
+    bootstrap(check_storage=not skip_storage)
+    click.echo("Bootstrap complete")
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    bootstrap(check_storage='--skip-storage' not in sys.argv)
+    print("Bootstrap complete")
@@ -0,0 +1,323 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+from assets import BUNDLES, DIST_DIR, MANIFEST_NAME
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+STATIC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+# Characters after which a / starts a regular expression rather than a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'instanceof', 'new',
+                  'delete', 'void', 'throw', 'yield', 'await'}
+
+# A space next to one of these is never needed in JavaScript
+JS_SPACE_SAFE = set('{}()[];,:=<>?!&|*%^~')
+
+# A space next to one of these is never needed in CSS (":" is left alone, it is significant in selectors)
+CSS_SPACE_SAFE = set('{};,>')
+
+# Use the dedicated minifiers when they are installed, otherwise the conservative built-in ones
+try:
+    from rjsmin import jsmin as minify_js
+    logging.info("Using rjsmin for JavaScript minification")
+except ImportError:
+    minify_js = None
+
+try:
+    from rcssmin import cssmin as minify_css
+    logging.info("Using rcssmin for CSS minification")
+except ImportError:
+    minify_css = None
+
+# Brotli output is optional, gzip siblings are always written
+try:
+    import brotli
+except ImportError:
+    brotli = None
+    logging.info("brotli not available, only writing .gz files")
+
+# Static files that get precompressed siblings
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.svg', '.json')
+
+def scan_quoted(source, start, quote):
+    """Get the index after a quoted string starting at start"""
+    i = start + 1
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+            continue
+        if source[i] == quote or (source[i] == '\n' and quote != '`'):
+            return i + 1
+        i += 1
+    return len(source)
+
+def scan_template(source, start):
+    """Scan template literal text from start
+
+    Returns:
+        Tuple of (end index, True if the text ended at a ${ substitution)
+    """
+    i = start
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+            continue
+        if source[i] == '`':
+            return i + 1, False
+        if source.startswith('${', i):
+            return i + 2, True
+        i += 1
+    return len(source), False
+
+def scan_regex(source, start):
+    """Get the index after a regular expression literal, or None if it is not one"""
+    i = start + 1
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '\n':
+            return None
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            i += 1
+            while i < len(source) and (source[i].isalnum() or source[i] == '_'):
+                i += 1
+            return i
+        i += 1
+    return None
+
+def builtin_minify_js(source):
+    """Conservatively minify JavaScript
+
+    Removes comments and indentation and collapses whitespace while keeping
+    line breaks, so automatic semicolon insertion behaves exactly as before.
+    Strings, template literals and regular expressions are copied unchanged.
+    """
+    out = []
+    pending_space = None
+    last_char = ''
+    last_word = ''
+    brace_depth = 0
+    template_stack = []
+    i = 0
+    n = len(source)
+
+    while i < n:
+        char = source[i]
+
+        if char.isspace():
+            j = i
+            while j < n and source[j].isspace():
+                j += 1
+            pending_space = '\n' if '\n' in source[i:j] or pending_space == '\n' else ' '
+            i = j
+            continue
+
+        if source.startswith('//', i):
+            j = source.find('\n', i)
+            i = n if j == -1 else j
+            pending_space = pending_space or ' '
+            continue
+
+        if source.startswith('/*', i):
+            j = source.find('*/', i + 2)
+            j = n if j == -1 else j + 2
+            # A comment containing a line break counts as one for semicolon insertion
+            pending_space = '\n' if '\n' in source[i:j] or pending_space == '\n' else ' '
+            i = j
+            continue
+
+        if pending_space and out:
+            if pending_space == '\n' or not (last_char in JS_SPACE_SAFE or char in JS_SPACE_SAFE):
+                out.append(pending_space)
+        pending_space = None
+
+        if char in '"\'':
+            j = scan_quoted(source, i, char)
+            token = source[i:j]
+        elif char == '`' or (char == '}' and template_stack and brace_depth == 0):
+            if char == '}':
+                brace_depth = template_stack.pop()
+            j, substitution = scan_template(source, i + 1)
+            if substitution:
+                template_stack.append(brace_depth)
+                brace_depth = 0
+            token = source[i:j]
+        elif char == '/' and (last_char == '' or last_char in REGEX_PRECEDERS or last_word in REGEX_KEYWORDS):
+            j = scan_regex(source, i) or i + 1
+            token = source[i:j]
+        elif char.isalnum() or char in '_$':
+            j = i
+            while j < n and (source[j].isalnum() or source[j] in '_$'):
+                j += 1
+            token = source[i:j]
+        else:
+            if char == '{':
+                brace_depth += 1
+            elif char == '}':
+                brace_depth -= 1
+            j = i + 1
+            token = char
+
+        out.append(token)
+        last_word = token if token[0].isalpha() else ''
+        last_char = token[-1]
+        i = j
+
+    return ''.join(out) + '\n'
+
+def builtin_minify_css(source):
+    """Minify CSS by removing comments and collapsing whitespace"""
+    out = []
+    pending_space = False
+    i = 0
+    n = len(source)
+
+    while i < n:
+        char = source[i]
+
+        if char.isspace():
+            while i < n and source[i].isspace():
+                i += 1
+            pending_space = True
+            continue
+
+        if source.startswith('/*', i):
+            j = source.find('*/', i + 2)
+            i = n if j == -1 else j + 2
+            pending_space = True
+            continue
+
+        if pending_space and out and out[-1][-1] not in CSS_SPACE_SAFE and char not in CSS_SPACE_SAFE:
+            out.append(' ')
+        pending_space = False
+
+        if char in '"\'':
+            j = scan_quoted(source, i, char)
+        else:
+            j = i + 1
+            # The last declaration of a block needs no semicolon
+            if char == '}' and out and out[-1] == ';':
+                out.pop()
+
+        out.append(source[i:j])
+        i = j
+
+    return ''.join(out) + '\n'
+
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+def rebase_css_urls(css, source_path, target_dir):
+    """Rewrite relative url() references so they still resolve from the bundle directory"""
+    source_dir = os.path.dirname(source_path)
+
+    def rebase(match):
+        quote, url = match.group(1), match.group(2)
+        if re.match(r'^(?:[a-z]+:|/|#)', url, re.IGNORECASE):
+            return match.group(0)
+        rebased = os.path.relpath(os.path.normpath(os.path.join(source_dir, url)), target_dir)
+        return f"url({quote}{rebased.replace(os.sep, '/')}{quote})"
+
+    return CSS_URL_RE.sub(rebase, css)
+
+def build_bundle(name, files, dist_dir):
+    """Concatenate and minify a bundle, returns the contents"""
+    is_css = name.endswith('.css')
+    parts = []
+    for filename in files:
+        path = os.path.join(STATIC_FOLDER, filename)
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+
+        if is_css:
+            source = rebase_css_urls(source, path, dist_dir)
+            parts.append((minify_css or builtin_minify_css)(source))
+        else:
+            # Each file keeps its own statement boundary inside the bundle
+            parts.append((minify_js or builtin_minify_js)(source).rstrip() + '\n;')
+
+    return '\n'.join(parts) + '\n'
+
+def build_assets():
+    """Build every bundle into static/dist with content-hashed file names
+
+    Returns:
+        The manifest mapping bundle names to hashed file names
+    """
+    dist_dir = os.path.join(STATIC_FOLDER, DIST_DIR)
+    shutil.rmtree(dist_dir, ignore_errors=True)
+    os.makedirs(dist_dir)
+
+    manifest = {}
+    for name, files in BUNDLES.items():
+        contents = build_bundle(name, files, dist_dir).encode('utf-8')
+        digest = hashlib.sha256(contents).hexdigest()[:12]
+        stem, extension = os.path.splitext(name)
+        hashed_name = f"{stem}.{digest}{extension}"
+
+        with open(os.path.join(dist_dir, hashed_name), 'wb') as f:
+            f.write(contents)
+
+        source_size = sum(os.path.getsize(os.path.join(STATIC_FOLDER, filename)) for filename in files)
+        logging.info(f"Built {hashed_name}: {source_size} -> {len(contents)} bytes")
+        manifest[name] = hashed_name
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return manifest
+
+def compress_static_files():
+    """Write .gz and .br siblings next to every compressible static file
+
+    The static view serves these instead of the original when the client
+    accepts the encoding, so nothing is compressed at request time.
+    """
+    original_size = 0
+    gzip_size = 0
+    brotli_size = 0
+
+    for directory, _, filenames in os.walk(STATIC_FOLDER):
+        for filename in filenames:
+            if not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+
+            path = os.path.join(directory, filename)
+            with open(path, 'rb') as f:
+                data = f.read()
+            original_size += len(data)
+
+            # mtime=0 keeps the output identical between builds
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            with open(path + '.gz', 'wb') as f:
+                f.write(compressed)
+            gzip_size += len(compressed)
+
+            if brotli:
+                compressed = brotli.compress(data, quality=11)
+                with open(path + '.br', 'wb') as f:
+                    f.write(compressed)
+                brotli_size += len(compressed)
+
+    logging.info(f"Compressed static files: {original_size} bytes -> {gzip_size} gzip, {brotli_size or 'no'} brotli")
+
+if __name__ == "__main__":
+    build_assets()
+    compress_static_files()
+    print("Static assets built successfully!")
@@ -0,0 +1,129 @@
+import json
+import os
+import subprocess
+import sys
+
+# Seconds importing the app may take in a fresh interpreter
+DEFAULT_IMPORT_BUDGET = 3.0
+
+# Optional integrations that must only be imported when they are first used
+LAZY_MODULES = ('supabase', 'argon2')
+
+# Modules listed by the --report breakdown
+REPORT_TOP_MODULES = 20
+
+# Runs in a fresh interpreter: imports the app the way a worker does and
+# records the time taken, peak memory, database connections, outgoing network
+# connections and which lazy modules got imported
+CHILD_SCRIPT = '''
+import json
+import resource
+import socket
+import sys
+import time
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+db_connections = []
+network_connections = []
+
+event.listen(Pool, 'connect', lambda dbapi_connection, record: db_connections.append(1))
+
+original_connect = socket.socket.connect
+def recording_connect(self, address):
+    network_connections.append(repr(address))
+    return original_connect(self, address)
+socket.socket.connect = recording_connect
+
+start = time.perf_counter()
+import main  # noqa: F401
+elapsed = time.perf_counter() - start
+
+sys.stdout.write(json.dumps({
+    'seconds': elapsed,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'db_connections': len(db_connections),
+    'network_connections': network_connections,
+    'loaded_modules': sorted(name for name in sys.modules if '.' not in name)
+}))
+'''
+
+def measure_import(importtime=False):
+    """Import main.py in a fresh interpreter and report what it did
+
+    With importtime the per-module timings from python -X importtime are
+    included as (cumulative microseconds, self microseconds, module) tuples.
+    """
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', CHILD_SCRIPT]
+    result = subprocess.run(
+        command,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing the app failed:\n{result.stderr}")
+
+    report = json.loads(result.stdout)
+    if importtime:
+        report['modules'] = parse_importtime(result.stderr)
+    return report
+
+def parse_importtime(output):
+    """Parse python -X importtime output into (cumulative us, self us, module) tuples"""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        modules.append((int(cumulative_us), int(self_us), name.strip()))
+    return modules
+
+def print_report():
+    """Print import time, peak RSS and the slowest modules to import"""
+    report = measure_import(importtime=True)
+    print(f"Import time: {report['seconds']:.3f}s")
+    print(f"Peak RSS: {report['max_rss_kb'] / 1024:.1f} MiB")
+
+    loaded = [name for name in LAZY_MODULES if name in report['loaded_modules']]
+    print(f"Lazy modules loaded at import: {', '.join(loaded) or 'none'}")
+
+    print(f"\nSlowest imports (top {REPORT_TOP_MODULES} by cumulative time):")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, name in sorted(report['modules'], reverse=True)[:REPORT_TOP_MODULES]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+def check_startup(budget):
+    """Check that importing the app is fast and does no database or network work
+
+    Returns:
+        List of problems, empty if the check passed
+    """
+    report = measure_import()
+    problems = []
+
+    if report['seconds'] > budget:
+        problems.append(f"Import took {report['seconds']:.2f}s, budget is {budget:.2f}s")
+    if report['db_connections']:
+        problems.append(f"Import opened {report['db_connections']} database connection(s)")
+    if report['network_connections']:
+        problems.append(f"Import made network connections: {', '.join(report['network_connections'])}")
+    for name in LAZY_MODULES:
+        if name in report['loaded_modules']:
+            problems.append(f"Import loaded {name}, which should only be imported on first use")
+
+    print(f"Import time: {report['seconds']:.3f}s (budget {budget:.2f}s)")
+    return problems
+
+if __name__ == "__main__":
+    if '--report' in sys.argv:
+        print_report()
+        sys.exit(0)
+
+    budget = float(os.environ.get('IMPORT_TIME_BUDGET', DEFAULT_IMPORT_BUDGET))
+    problems = check_startup(budget)
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if problems:
+        sys.exit(1)
+    print("Startup check passed")
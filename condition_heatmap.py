@@ -0,0 +1,114 @@
+import bisect
+from datetime import datetime, time, timedelta
+
+# NumPy is optional, without it the day buckets are computed in pure Python
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Longest range a heatmap can cover
+MAX_DAYS = 731
+
+# Days in the rolling average used for trend lines
+TREND_DAYS = 7
+
+def day_boundaries(start, days, tz):
+    """Get the epoch seconds of the local midnights from start to the day after the last day
+
+    Computed per day, so days that are 23 or 25 hours long because of a
+    daylight saving change are bucketed correctly.
+    """
+    return [
+        datetime.combine(start + timedelta(days=offset), time(), tz).timestamp()
+        for offset in range(days + 1)
+    ]
+
+def bucket_days(timestamps, values, boundaries):
+    """Sum values and count entries per day
+
+    Args:
+        timestamps: Epoch seconds of the entries
+        values: Value of each entry
+        boundaries: Epoch seconds of the day boundaries (see day_boundaries)
+
+    Returns:
+        (totals, counts) lists with one item per day
+    """
+    days = len(boundaries) - 1
+    if numpy is not None:
+        timestamps = numpy.asarray(timestamps, dtype=numpy.float64)
+        values = numpy.asarray(values, dtype=numpy.float64)
+        index = numpy.searchsorted(boundaries, timestamps, side='right') - 1
+        inside = (index >= 0) & (index < days)
+        index = index[inside]
+        totals = numpy.bincount(index, weights=values[inside], minlength=days)
+        counts = numpy.bincount(index, minlength=days)
+        return totals.tolist(), counts.tolist()
+
+    totals = [0.0] * days
+    counts = [0] * days
+    for timestamp, value in zip(timestamps, values):
+        index = bisect.bisect_right(boundaries, timestamp) - 1
+        if 0 <= index < days:
+            totals[index] += value
+            counts[index] += 1
+    return totals, counts
+
+def rolling_mean(totals, window=TREND_DAYS):
+    """Average of each day and the window - 1 days before it (fewer at the start)"""
+    if numpy is not None:
+        sums = numpy.cumsum(numpy.asarray(totals, dtype=numpy.float64))
+        window_sums = sums.copy()
+        window_sums[window:] -= sums[:-window]
+        sizes = numpy.minimum(numpy.arange(1, len(sums) + 1), window)
+        return (window_sums / sizes).tolist()
+
+    means = []
+    running = 0.0
+    for index, total in enumerate(totals):
+        running += total
+        if index >= window:
+            running -= totals[index - window]
+        means.append(running / min(index + 1, window))
+    return means
+
+def build_heatmap(timestamps, values, start, days, tz, goal=None, boundaries=None):
+    """Aggregate condition entries into a calendar heatmap
+
+    Args:
+        timestamps: Epoch seconds of the entries
+        values: Value of each entry
+        start: First day (a date in tz)
+        days: Number of days
+        tz: Timezone the days are in
+        goal: The condition's daily goal, if it has one
+        boundaries: Day boundaries in the timestamps' epoch, if not day_boundaries()
+
+    Returns:
+        Dict of per-day columns (totals, counts, attainment, trend) and a summary
+    """
+    totals, counts = bucket_days(timestamps, values, boundaries or day_boundaries(start, days, tz))
+    totals = [round(total, 3) for total in totals]
+
+    # Share of the daily goal reached each day, capped at 1
+    attainment = None
+    days_goal_met = None
+    if goal:
+        attainment = [round(min(total / goal, 1.0), 3) for total in totals]
+        days_goal_met = sum(1 for total in totals if total >= goal)
+
+    days_logged = sum(1 for count in counts if count)
+    total = round(sum(totals), 3)
+    return {
+        'totals': totals,
+        'counts': counts,
+        'attainment': attainment,
+        'trend': [round(mean, 3) for mean in rolling_mean(totals)],
+        'summary': {
+            'daysLogged': days_logged,
+            'daysGoalMet': days_goal_met,
+            'total': total,
+            'averagePerLoggedDay': round(total / days_logged, 3) if days_logged else 0
+        }
+    }
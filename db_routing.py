@@ -0,0 +1,151 @@
+import random
+import time
+from functools import wraps
+from flask import g, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlite_mode import READ_BIND_KEY
+
+# Session.info key set once the current transaction has written something
+WROTE_KEY = 'db_routing_wrote'
+
+# Session.info key that sends every statement of the session to the write engine
+PINNED_KEY = 'db_routing_pinned'
+
+# Session.info key holding the engines the current transaction has a connection of
+ENGINES_KEY = 'db_routing_engines'
+
+# Session.info key of the replica picked for the session
+REPLICA_KEY = 'db_routing_replica'
+
+# Bind keys of read replicas are REPLICA_BIND_PREFIX + index
+REPLICA_BIND_PREFIX = 'replica-'
+
+# Flask session key holding the time until which the client reads from the primary
+PRIMARY_UNTIL_KEY = 'db_primary_until'
+
+# Seconds after a write during which the same client keeps reading from the primary
+DEFAULT_STICKY_SECONDS = 5
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs to a replica or the read pool
+
+    Views marked with use_replica() read from one of the configured read
+    replicas, other plain SELECTs use the SQLite read pool when there is
+    one. Everything else (flushes, INSERT/UPDATE/DELETE, SELECT ... FOR
+    UPDATE, text statements) goes to the write engine, and so does every
+    statement after the current transaction has written, so a request
+    always reads its own uncommitted changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None:
+            return engine
+
+        if getattr(clause, 'is_dml', False):
+            self.info[WROTE_KEY] = True
+            if has_request_context():
+                g.db_wrote = True
+            return engine
+
+        if self.is_plain_read(clause):
+            engines = self._db.engines
+            # Only models on the default database have replicas and a read pool
+            if engine is engines[None]:
+                replica = self.get_replica(engines)
+                if replica is not None:
+                    return replica
+                if READ_BIND_KEY in engines:
+                    return engines[READ_BIND_KEY]
+
+        return engine
+
+    def get_replica(self, engines):
+        """Get the replica engine for this session if the current view reads from replicas"""
+        if not (has_request_context() and g.get('db_use_replica')):
+            return None
+
+        # One replica per session so a request sees a single consistent copy
+        key = self.info.get(REPLICA_KEY)
+        if key is None:
+            keys = [key for key in engines if isinstance(key, str) and key.startswith(REPLICA_BIND_PREFIX)]
+            if not keys:
+                return None
+            key = self.info[REPLICA_KEY] = random.choice(keys)
+        return engines[key]
+
+    def is_plain_read(self, clause):
+        return (
+            getattr(clause, 'is_select', False)
+            and getattr(clause, '_for_update_arg', None) is None
+            and not self._flushing
+            and not self.info.get(WROTE_KEY)
+            and not self.info.get(PINNED_KEY)
+        )
+
+def holds_connection(session, engine):
+    """Check if a session's current transaction has a connection of an engine checked out"""
+    return engine in session.info.get(ENGINES_KEY, ())
+
+def pin_to_primary(session):
+    """Send all of a session's statements to the write engine
+
+    For read-modify-write code that must read the rows it is about to
+    update under the write lock.
+    """
+    session.info[PINNED_KEY] = True
+
+@event.listens_for(RoutingSession, 'after_flush')
+def mark_written(db_session, flush_context):
+    db_session.info[WROTE_KEY] = True
+    if has_request_context():
+        g.db_wrote = True
+
+@event.listens_for(RoutingSession, 'after_begin')
+def remember_engine(db_session, transaction, connection):
+    db_session.info.setdefault(ENGINES_KEY, set()).add(connection.engine)
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def reset_written(db_session, transaction):
+    if transaction.parent is None:
+        db_session.info.pop(WROTE_KEY, None)
+        db_session.info.pop(ENGINES_KEY, None)
+
+def use_replica(f):
+    """Let a read-only view read from a replica
+
+    Clients that wrote within the last REPLICA_STICKY_SECONDS keep reading
+    from the primary, so they always see their own writes.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if session.get(PRIMARY_UNTIL_KEY, 0) < time.time():
+            g.db_use_replica = True
+        return f(*args, **kwargs)
+    return decorated_function
+
+def remember_write(response, sticky_seconds):
+    # Set in the signed session cookie so every worker sees it
+    if g.get('db_wrote'):
+        session[PRIMARY_UNTIL_KEY] = time.time() + sticky_seconds
+    return response
+
+def configure_replicas(app, replica_urls):
+    """Add a bind for each read replica URL (comma separated)
+
+    Must be called before db.init_app().
+    """
+    urls = [url.strip() for url in (replica_urls or '').split(',') if url.strip()]
+    binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+    for index, url in enumerate(urls):
+        # Heroku/Render style URLs, as for DATABASE_URL
+        if url.startswith('postgres://'):
+            url = url.replace('postgres://', 'postgresql://', 1)
+        binds[f'{REPLICA_BIND_PREFIX}{index}'] = url
+    return len(urls)
+
+def init_db_routing(app):
+    """Keep clients that just wrote on the primary for REPLICA_STICKY_SECONDS"""
+    sticky_seconds = float(app.config.get('REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS))
+    app.after_request(lambda response: remember_write(response, sticky_seconds))
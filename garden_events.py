@@ -0,0 +1,119 @@
+import json
+import logging
+import queue
+import threading
+import time
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_INTERVAL = 15
+
+# Milliseconds the browser waits before reconnecting a dropped stream
+RETRY_INTERVAL = 5000
+
+# Events buffered per connection before the oldest ones are dropped
+MAX_QUEUED_EVENTS = 100
+
+class GardenEventHub:
+    """In-process publish/subscribe hub for live garden updates
+
+    Write paths publish plant, credit and achievement changes for a user and every
+    open /api/garden/stream connection of that user receives them. Each
+    connection only holds a small queue and blocks in queue.get(), so under
+    gunicorn's gevent worker thousands of idle streams cost one greenlet each.
+
+    The hub is per worker process: a client receives the changes made by
+    requests handled in the same worker.
+    """
+
+    def __init__(self, max_queued_events=MAX_QUEUED_EVENTS):
+        self.max_queued_events = max_queued_events
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._next_event_id = 0
+
+    def subscribe(self, user_id):
+        """Register a new connection for a user and return its event queue"""
+        events = queue.Queue(maxsize=self.max_queued_events)
+        with self._lock:
+            self._subscribers.setdefault(str(user_id), set()).add(events)
+        return events
+
+    def unsubscribe(self, user_id, events):
+        """Remove a connection's event queue"""
+        with self._lock:
+            user_queues = self._subscribers.get(str(user_id))
+            if user_queues:
+                user_queues.discard(events)
+                if not user_queues:
+                    del self._subscribers[str(user_id)]
+
+    def subscriber_count(self, user_id=None):
+        """Get the number of open connections, optionally for one user"""
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(str(user_id), ()))
+            return sum(len(user_queues) for user_queues in self._subscribers.values())
+
+    def publish(self, user_id, event, data):
+        """Send an event to every open connection of a user
+
+        Args:
+            user_id: The user whose garden changed
+            event: The event name (plant, plant_deleted, credits, score or achievement)
+            data: JSON serializable event payload
+        """
+        with self._lock:
+            user_queues = list(self._subscribers.get(str(user_id), ()))
+            if not user_queues:
+                return
+            self._next_event_id += 1
+            message = format_event(self._next_event_id, event, data)
+
+        for events in user_queues:
+            try:
+                events.put_nowait(message)
+            except queue.Full:
+                # Slow client, drop its oldest event rather than block the writer
+                try:
+                    events.get_nowait()
+                    events.put_nowait(message)
+                except (queue.Empty, queue.Full):
+                    logging.warning(f"Dropped garden event {event} for user {user_id}")
+
+    def stream(self, user_id, heartbeat_interval=HEARTBEAT_INTERVAL):
+        """Generate Server-Sent Events for a user until the client disconnects"""
+        events = self.subscribe(user_id)
+        try:
+            yield f"retry: {RETRY_INTERVAL}\n\n"
+            while True:
+                try:
+                    yield events.get(timeout=heartbeat_interval)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing the idle connection
+                    yield f": keep-alive {int(time.time())}\n\n"
+        finally:
+            self.unsubscribe(user_id, events)
+
+def format_event(event_id, event, data):
+    """Format a single Server-Sent Event"""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+# Shared hub for the worker process
+hub = GardenEventHub()
+
+def publish_plant(plant):
+    """Publish the current state of a plant"""
+    from serializers import PLANT_FIELDS, serialize_model
+    hub.publish(plant.user_id, 'plant', serialize_model(plant, PLANT_FIELDS))
+
+def publish_plant_deleted(user_id, plant_id):
+    """Publish that a plant was removed from the garden"""
+    hub.publish(user_id, 'plant_deleted', {'id': plant_id})
+
+def publish_credits(user):
+    """Publish a user's water credit balance"""
+    hub.publish(user.id, 'credits', {'water_credits': user.water_credits})
+
+def publish_achievement(user_id, achievement):
+    """Publish an achievement the user just unlocked"""
+    hub.publish(user_id, 'achievement', achievement)
@@ -0,0 +1,71 @@
+import logging
+import os
+import threading
+import time
+from flask import jsonify
+from sqlalchemy import text
+
+# Seconds a readiness result is reused, so probes don't hit the database every time
+READINESS_CACHE_SECONDS = 5
+
+_lock = threading.Lock()
+_last_result = None
+_last_checked = 0.0
+
+def check_readiness(db):
+    """Check the database is reachable and has been bootstrapped
+
+    Supabase is only reported, it never makes the app unready.
+
+    Returns:
+        Tuple of (ready, checks dict)
+    """
+    checks = {}
+    ready = True
+
+    try:
+        db.session.execute(text('SELECT 1'))
+        checks['database'] = 'ok'
+    except Exception as e:
+        logging.error(f"Readiness check failed for database: {str(e)}")
+        checks['database'] = 'unavailable'
+        ready = False
+
+    if ready:
+        try:
+            from models import ConditionType
+            checks['seed_data'] = 'ok' if ConditionType.query.first() else 'missing'
+        except Exception as e:
+            logging.error(f"Readiness check failed for seed data: {str(e)}")
+            checks['seed_data'] = 'missing'
+        # Run the bootstrap command to create the tables and seed data
+        ready = checks['seed_data'] == 'ok'
+
+    db.session.rollback()
+
+    configured = os.environ.get('SUPABASE_URL') and os.environ.get('SUPABASE_KEY')
+    checks['supabase'] = 'configured' if configured else 'not configured'
+
+    return ready, checks
+
+def init_health(app, db):
+    """Add /healthz (process is up) and /readyz (database is usable) endpoints
+
+    Nothing is checked at startup, the readiness checks run on the first
+    /readyz request and their result is cached for READINESS_CACHE_SECONDS.
+    """
+    def healthz():
+        return jsonify({'status': 'ok'})
+
+    def readyz():
+        global _last_result, _last_checked
+        with _lock:
+            if _last_result is None or time.monotonic() - _last_checked > READINESS_CACHE_SECONDS:
+                _last_result = check_readiness(db)
+                _last_checked = time.monotonic()
+            ready, checks = _last_result
+
+        return jsonify({'status': 'ready' if ready else 'unavailable', 'checks': checks}), 200 if ready else 503
+
+    app.add_url_rule('/healthz', 'healthz', healthz)
+    app.add_url_rule('/readyz', 'readyz', readyz)
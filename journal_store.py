@@ -0,0 +1,296 @@
+import copy
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+# File locks are only available on Unix, elsewhere the store is per process
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Name of the append-only journal inside the store directory
+JOURNAL_NAME = 'journal.log'
+
+# Lock file shared by every process using the store
+LOCK_NAME = 'journal.lock'
+
+# Journal records written before the store is compacted into snapshots
+DEFAULT_COMPACT_EVERY = 1000
+
+class JournalStore:
+    """Collections of JSON data persisted as snapshots plus an append-only journal
+
+    Every change appends one JSON line to the journal, so a write costs
+    O(size of the change) instead of rewriting every file. Each collection
+    also has a <name>.json snapshot; after compact_every records the
+    snapshots are rewritten (to a temporary file, then renamed over the old
+    one) and the journal is replaced by an empty one. Loading reads the
+    snapshots and replays the journal, ignoring a last line left incomplete
+    by a crash.
+
+    The store is shared by every worker process using the same directory.
+    Writes hold an exclusive lock on the lock file and reads a shared one,
+    and both first apply the records other workers appended since this
+    process last looked (or reload everything if the journal was
+    compacted, which bumps a counter in the lock file), so each operation costs O(new records), not O(all data).
+
+    Collections holding a dict are read and changed per key with get(),
+    update(), put() and delete(), collections holding a list are replaced
+    as a whole with replace().
+
+    indexes maps dict collections to a field of their records, e.g.
+    {'plants': 'userId'}. The store keeps an index from each value of the
+    field to the keys of the records having it, updated as records are
+    put and deleted, and find() uses it to get a user's records without
+    scanning the others.
+    """
+
+    def __init__(self, directory, data, compact_every=DEFAULT_COMPACT_EVERY, indexes=None):
+        self.directory = directory
+        self.data = data
+        self.compact_every = compact_every
+        self.indexes = dict(indexes or {})
+        # collection -> field value -> {key: None}, a dict keeps insertion order
+        self._index = {collection: {} for collection in self.indexes}
+        self.journal_path = os.path.join(directory, JOURNAL_NAME)
+        self.lock_path = os.path.join(directory, LOCK_NAME)
+        self._empty = {collection: copy.deepcopy(value) for collection, value in data.items()}
+        self._generation = None
+        self._position = 0
+        self._records = 0
+        self._thread_lock = threading.RLock()
+        self._lock_fd = None
+        self._lock_pid = None
+
+    def snapshot_path(self, collection):
+        return os.path.join(self.directory, f'{collection}.json')
+
+    @contextmanager
+    def locked(self, exclusive):
+        """Hold the thread lock and the cross-process file lock"""
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+
+            # A forked worker must not share the parent's lock file description
+            if self._lock_pid != os.getpid():
+                self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                self._lock_pid = os.getpid()
+
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def read_generation(self):
+        # The lock file holds a counter bumped by every compaction. Inode
+        # numbers can't be used for this as they get reused.
+        if self._lock_fd is None:
+            return 0
+        return int(os.pread(self._lock_fd, 32, 0) or 0)
+
+    def load(self):
+        """Load the snapshots and replay the journal into data"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self.locked(exclusive=True):
+            self.discard_incomplete_record()
+            self.reload()
+            logging.info(f"Loaded journal store with {self._records} journal records")
+
+    def discard_incomplete_record(self):
+        # A crash while appending can leave a partial last line, drop it so
+        # the next record doesn't get glued onto it
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r+b') as f:
+            contents = f.read()
+            complete = contents.rfind(b'\n') + 1
+            if complete < len(contents):
+                logging.warning(f"Discarding incomplete journal record ({len(contents) - complete} bytes)")
+                f.truncate(complete)
+
+    def reload(self):
+        """Read every snapshot and replay the whole journal"""
+        for collection, empty in self._empty.items():
+            self.data[collection] = copy.deepcopy(empty)
+            path = self.snapshot_path(collection)
+            if os.path.exists(path):
+                try:
+                    with open(path, 'r') as f:
+                        self.data[collection] = json.load(f)
+                except Exception as e:
+                    logging.error(f"Error loading snapshot for {collection}: {str(e)}")
+            self.rebuild_index(collection)
+
+        self._generation = self.read_generation()
+        self._position = 0
+        self._records = 0
+        self.catch_up()
+
+    def catch_up(self):
+        """Apply the records appended since this process last read the journal"""
+        if self.read_generation() != self._generation:
+            # Another worker compacted the store, start again from its snapshots
+            self.reload()
+            return
+
+        try:
+            size = os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            return
+        if size <= self._position:
+            return
+
+        with open(self.journal_path, 'rb') as f:
+            f.seek(self._position)
+            contents = f.read()
+
+        complete = contents.rfind(b'\n') + 1
+        for line in contents[:complete].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self.apply(json.loads(line))
+                self._records += 1
+            except Exception as e:
+                logging.error(f"Skipping unreadable journal record: {str(e)}")
+        self._position += complete
+
+    def apply(self, record):
+        collection = record['collection']
+        if record['op'] == 'put':
+            key = record['key']
+            self.unindex(collection, key, self.data[collection].get(key))
+            self.data[collection][key] = record['value']
+            self.index(collection, key, record['value'])
+        elif record['op'] == 'delete':
+            key = record['key']
+            self.unindex(collection, key, self.data[collection].pop(key, None))
+        elif record['op'] == 'replace':
+            self.data[collection] = record['value']
+            self.rebuild_index(collection)
+
+    def index(self, collection, key, value):
+        if collection in self.indexes and isinstance(value, dict):
+            field_value = value.get(self.indexes[collection])
+            self._index[collection].setdefault(field_value, {})[key] = None
+
+    def unindex(self, collection, key, value):
+        if collection in self.indexes and isinstance(value, dict):
+            field_value = value.get(self.indexes[collection])
+            keys = self._index[collection].get(field_value)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self._index[collection][field_value]
+
+    def rebuild_index(self, collection):
+        if collection not in self.indexes:
+            return
+        self._index[collection] = {}
+        if isinstance(self.data[collection], dict):
+            for key, value in self.data[collection].items():
+                self.index(collection, key, value)
+
+    def append(self, record):
+        # Must be called holding the exclusive lock, after catch_up()
+        self.apply(record)
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            f.flush()
+            self._position = f.tell()
+
+        self._records += 1
+        if self._records >= self.compact_every:
+            self.compact()
+
+    def get(self, collection, key=None):
+        """Get one key of a dict collection (None if missing), or a whole collection"""
+        with self.locked(exclusive=False):
+            self.catch_up()
+            if key is None:
+                return self.data[collection]
+            return self.data[collection].get(key)
+
+    def find(self, collection, field_value):
+        """Get the records of an indexed collection whose indexed field equals field_value"""
+        with self.locked(exclusive=False):
+            self.catch_up()
+            records = self.data[collection]
+            return [records[key] for key in self._index[collection].get(field_value, ())]
+
+    def update(self, collection, key, fn, default=None):
+        """Change one key of a dict collection based on its latest value
+
+        fn gets a copy of the current value (or of default if the key is
+        missing) to change in place. If it returns False nothing is written.
+
+        Returns:
+            The stored value
+        """
+        with self.locked(exclusive=True):
+            self.catch_up()
+            current = self.data[collection].get(key, default)
+            value = copy.deepcopy(current)
+            if fn(value) is False:
+                return current
+            self.append({'op': 'put', 'collection': collection, 'key': key, 'value': value})
+            return value
+
+    def setdefault(self, collection, key, value):
+        """Store value for a key of a dict collection unless it already has one"""
+        with self.locked(exclusive=True):
+            self.catch_up()
+            if key not in self.data[collection]:
+                self.append({'op': 'put', 'collection': collection, 'key': key, 'value': value})
+            return self.data[collection][key]
+
+    def put(self, collection, key, value):
+        """Store the value of one key of a dict collection"""
+        with self.locked(exclusive=True):
+            self.catch_up()
+            self.append({'op': 'put', 'collection': collection, 'key': key, 'value': value})
+
+    def delete(self, collection, key):
+        """Remove one key of a dict collection"""
+        with self.locked(exclusive=True):
+            self.catch_up()
+            self.append({'op': 'delete', 'collection': collection, 'key': key})
+
+    def replace(self, collection, value):
+        """Replace a whole collection"""
+        with self.locked(exclusive=True):
+            self.catch_up()
+            self.append({'op': 'replace', 'collection': collection, 'value': value})
+
+    def compact(self):
+        """Write every collection to its snapshot and start an empty journal
+
+        Must be called holding the exclusive lock. Other workers notice the
+        new journal file and reload from the snapshots.
+        """
+        for collection, value in self.data.items():
+            write_atomic(self.snapshot_path(collection), value)
+
+        write_atomic(self.journal_path, None)
+        self._generation = self.read_generation() + 1
+        if self._lock_fd is not None:
+            os.pwrite(self._lock_fd, str(self._generation).encode().ljust(32), 0)
+        self._position = 0
+        self._records = 0
+        logging.info("Compacted journal store")
+
+def write_atomic(path, value):
+    """Write JSON (or an empty file for None) to path, all or nothing"""
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        if value is not None:
+            json.dump(value, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
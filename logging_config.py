@@ -0,0 +1,100 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+# Logger used for the per-request access log lines
+REQUEST_LOGGER_NAME = 'pixelsprout.requests'
+
+# Attributes every LogRecord has, anything else was passed through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including extra= fields"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Let through a fraction of records, warnings and errors always pass"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+def parse_levels(value):
+    """Parse LOG_LEVELS, e.g. "sqlalchemy.engine=WARNING,werkzeug=INFO" """
+    levels = {}
+    for entry in (value or '').split(','):
+        if '=' in entry:
+            name, level = entry.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def configure_logging(debug=False):
+    """Configure non-blocking logging for the application
+
+    Records are put on a queue by the calling thread and formatted and
+    written by a background listener thread, so requests never wait on
+    stdout. Configured from the environment:
+
+        LOG_LEVEL: Root level, INFO by default and DEBUG in debug mode
+        LOG_LEVELS: Per-logger levels, e.g. "sqlalchemy.engine=WARNING"
+        LOG_FORMAT: "json" (default in production) or "text"
+        LOG_REQUEST_SAMPLE_RATE: Fraction of request log lines to keep (default 0.1, 1 in debug mode)
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_format = os.environ.get('LOG_FORMAT', 'text' if debug else 'json')
+    if log_format == 'json':
+        formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+
+    output_handler = logging.StreamHandler(sys.stderr)
+    output_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, output_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(os.environ.get('LOG_LEVEL', 'DEBUG' if debug else 'INFO').upper())
+
+    for name, level in parse_levels(os.environ.get('LOG_LEVELS')).items():
+        logging.getLogger(name).setLevel(level)
+
+    sample_rate = float(os.environ.get('LOG_REQUEST_SAMPLE_RATE', 1.0 if debug else 0.1))
+    request_logger = logging.getLogger(REQUEST_LOGGER_NAME)
+    if sample_rate < 1.0:
+        request_logger.addFilter(SamplingFilter(sample_rate))
@@ -0,0 +1,195 @@
+import hmac
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds of the latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the per-request query count histogram buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Route label for requests that did not match any URL rule
+UNMATCHED_ROUTE = '<unmatched>'
+
+class Histogram:
+    """Fixed-bucket histogram, observing a value is a bisect and two additions"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self):
+        """Get (upper bound, cumulative count) pairs including +Inf"""
+        total = 0
+        for bound, count in zip(self.bounds + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+class MetricsRegistry:
+    """Request metrics of the current worker process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_duration = {}
+        self.request_count = {}
+        self.db_duration = {}
+        self.db_queries = {}
+
+    def record_request(self, method, route, status, duration, db_time, query_count):
+        """Record a finished request"""
+        key = (method, route)
+        with self._lock:
+            histogram = self.request_duration.get(key)
+            if histogram is None:
+                histogram = self.request_duration[key] = Histogram(LATENCY_BUCKETS)
+                self.db_duration[key] = Histogram(LATENCY_BUCKETS)
+                self.db_queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+            histogram.observe(duration)
+            self.db_duration[key].observe(db_time)
+            self.db_queries[key].observe(query_count)
+
+            count_key = (method, route, status)
+            self.request_count[count_key] = self.request_count.get(count_key, 0) + 1
+
+    def render(self, pool_stats=None):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            render_histograms(lines, 'pixelsprout_http_request_duration_seconds',
+                              'Time spent handling requests', self.request_duration)
+
+            lines.append('# HELP pixelsprout_http_requests_total Requests handled by route and status code')
+            lines.append('# TYPE pixelsprout_http_requests_total counter')
+            for (method, route, status), count in sorted(self.request_count.items()):
+                labels = format_labels(method=method, route=route, status=status)
+                lines.append(f'pixelsprout_http_requests_total{{{labels}}} {count}')
+
+            render_histograms(lines, 'pixelsprout_db_duration_seconds',
+                              'Time spent executing SQL per request', self.db_duration)
+            render_histograms(lines, 'pixelsprout_db_queries_per_request',
+                              'SQL statements executed per request', self.db_queries)
+
+        for name, value in (pool_stats or {}).items():
+            lines.append(f'# HELP pixelsprout_db_pool_{name} SQLAlchemy connection pool {name.replace("_", " ")}')
+            lines.append(f'# TYPE pixelsprout_db_pool_{name} gauge')
+            lines.append(f'pixelsprout_db_pool_{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+def render_histograms(lines, name, description, histograms):
+    lines.append(f'# HELP {name} {description}')
+    lines.append(f'# TYPE {name} histogram')
+    for (method, route), histogram in sorted(histograms.items()):
+        labels = format_labels(method=method, route=route)
+        for bound, count in histogram.cumulative_counts():
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{name}_sum{{{labels}}} {histogram.sum:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+def escape_label_value(value):
+    """Escape backslashes, quotes and newlines in a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(**labels):
+    """Format Prometheus labels"""
+    return ','.join(f'{key}="{escape_label_value(value)}"' for key, value in labels.items())
+
+def get_pool_stats(engine):
+    """Get connection pool gauges for pools that expose them"""
+    pool = engine.pool
+    stats = {}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        method = getattr(pool, name, None)
+        if callable(method):
+            try:
+                stats[name] = method()
+            except Exception:
+                # Some pool implementations only stub these out
+                continue
+    return stats
+
+# Shared registry for the worker process
+registry = MetricsRegistry()
+
+def start_request_metrics():
+    g.metrics_start_time = time.perf_counter()
+    g.metrics_db_time = 0.0
+    g.metrics_query_count = 0
+
+def record_request_metrics(response):
+    start_time = g.get('metrics_start_time')
+    if start_time is not None:
+        route = request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE
+        registry.record_request(
+            request.method,
+            route,
+            response.status_code,
+            time.perf_counter() - start_time,
+            g.metrics_db_time,
+            g.metrics_query_count
+        )
+    return response
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's own context, so a failed statement leaves nothing behind
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    query_start = getattr(context, '_metrics_start', None)
+    if query_start is None:
+        return
+    duration = time.perf_counter() - query_start
+
+    # Queries can also run outside of requests (CLI commands, startup)
+    if g and 'metrics_start_time' in g:
+        g.metrics_db_time += duration
+        g.metrics_query_count += 1
+
+def init_metrics(app, db):
+    """Record request metrics and expose them at /metrics
+
+    Metrics are kept per worker process. Scrapes must send METRICS_TOKEN as
+    a bearer token. Without a token, /metrics is only served in debug mode.
+    """
+    app.before_request(start_request_metrics)
+    app.after_request(record_request_metrics)
+
+    event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', after_cursor_execute)
+
+    metrics_token = os.environ.get('METRICS_TOKEN')
+    if not metrics_token:
+        logging.info("METRICS_TOKEN is not set, /metrics is only served in debug mode")
+
+    def metrics_view():
+        if not metrics_token:
+            # Routes and traffic are never exposed publicly outside debug mode
+            if not current_app.debug:
+                return Response('Not Found\n', status=404, mimetype='text/plain')
+        elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {metrics_token}'):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+
+        try:
+            pool_stats = get_pool_stats(db.engine)
+        except Exception:
+            pool_stats = {}
+
+        return Response(registry.render(pool_stats), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -1,13 +1,15 @@
 from datetime import datetime
+import logging
 from enum import Enum
 import os
-from sqlalchemy import String, Integer, Float, ForeignKey, DateTime, Enum as SQLEnum, Table, Column
+from sqlalchemy import String, Integer, Float, ForeignKey, DateTime, Enum as SQLEnum, Table, Column, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
 from typing import Optional, List
 from app import db
 from flask_login import UserMixin
+from achievements import record_event
 
 # Check if we're using SQLite (which doesn't support UUID)
 # If DATABASE_URL is not set or doesn't contain postgresql, we're using SQLite
@@ -66,6 +68,8 @@ class User(db.Model, UserMixin):
     username = Column(String(100), nullable=False)
     water_credits = Column(Integer, default=20, nullable=False)
     garden_score = Column(Integer, default=0, nullable=False)
+    # Bumped by every write that changes the garden, see plant_advisor.bump_garden_version
+    garden_version = Column(Integer, default=0, server_default='0', nullable=False)
     created_at = Column(DateTime, default=datetime.now)
     
     # Relationships
@@ -136,6 +140,26 @@ class User(db.Model, UserMixin):
             
         return friends
     
+    def get_friend_ids(self):
+        """Get the IDs of all accepted friends without loading their rows"""
+        friendships = db.session.query(Friendship.requester_id, Friendship.addressee_id).filter(
+            ((Friendship.requester_id == self.id) | (Friendship.addressee_id == self.id)),
+            Friendship.status == FriendshipStatus.ACCEPTED.value
+        ).all()
+        
+        return [
+            addressee_id if requester_id == self.id else requester_id
+            for requester_id, addressee_id in friendships
+        ]
+    
+    def record_friends_changed(self):
+        """Feed the user's current number of friends to the achievement engine"""
+        friend_count = db.session.query(Friendship).filter(
+            ((Friendship.requester_id == self.id) | (Friendship.addressee_id == self.id)),
+            Friendship.status == FriendshipStatus.ACCEPTED.value
+        ).count()
+        record_event(self.id, 'friends_changed', {'friend_count': friend_count, 'garden_score': self.garden_score})
+    
     def get_friend_requests(self):
         """Get all pending friend requests sent to this user"""
         return Friendship.query.filter_by(
@@ -160,25 +184,34 @@ class User(db.Model, UserMixin):
             self.increase_garden_score(50, "Added a new friend")
             
             db.session.commit()
+            
+            # Counts towards both users' friend achievements
+            for user in (requester, self):
+                if user:
+                    user.record_friends_changed()
             return True, "Friend request accepted"
         else:
             friendship.status = FriendshipStatus.DECLINED.value
             db.session.commit()
             return True, "Friend request declined"
             
-    def increase_garden_score(self, points, reason=""):
+    def increase_garden_score(self, points, reason="", commit=True):
         """Increase the user's garden score
         
         Args:
             points: Number of points to add
             reason: The reason for the point increase (for tracking purposes)
+            commit: Commit now, pass False when the caller commits (e.g. a
+                write intent)
         """
         self.garden_score += points
         db.session.add(self)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         
         # Log the score change (could be expanded to store in a table)
-        print(f"Garden score increased by {points} for user {self.username} ({reason}). New score: {self.garden_score}")
+        logging.debug("Garden score increased by %s for user %s (%s). New score: %s",
+                      points, self.username, reason, self.garden_score)
         
         return self.garden_score
         
@@ -259,6 +292,11 @@ class Condition(db.Model):
     value = Column(Float, nullable=False)
     date_logged = Column(DateTime, default=datetime.now)
     
+    # A user's history of one condition type is a single index range (heatmaps)
+    __table_args__ = (
+        Index('idx_conditions_user_type_date', 'user_id', 'type_name', 'date_logged'),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="conditions")
     
@@ -0,0 +1,308 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# Seconds a user's advice is served from the cache before it is computed again
+DEFAULT_ADVICE_TIMEOUT = 600
+
+# Days of condition history the advice is based on
+HISTORY_DAYS = 7
+
+# Users whose advice is kept per worker before the least recently used are evicted
+MAX_CACHED_USERS = 4096
+
+# Days without water after which a plant gets a watering reminder
+DRY_DAYS = 3
+
+# Share of a condition's daily goal below which the user is nudged about it
+GOAL_SHORTFALL = 0.8
+
+# Condition types with an advice topic of their own, others are 'motivation'
+CONDITION_TOPICS = {
+    'sunlight': 'sunlight',
+}
+
+# Tips used when there is nothing personal to say about a topic
+GENERAL_TIPS = {
+    'watering': [
+        "Remember that consistent watering is key to healthy plants. Try to water at the same time each day.",
+        "When watering, aim for the soil rather than the leaves to prevent fungal issues.",
+        "Most plants prefer deep, infrequent watering rather than frequent light watering."
+    ],
+    'sunlight': [
+        "Rotate your plants occasionally so all sides get equal sunlight exposure.",
+        "If your plant's leaves are yellowing, it might be getting too much direct sunlight.",
+        "For plants that need indirect light, place them near a north or east-facing window."
+    ],
+    'motivation': [
+        "Building habits takes time. Focus on consistency rather than perfection.",
+        "Try linking your new habit to an existing routine to make it easier to remember.",
+        "Celebrate small wins! Each day you complete your habit is a success."
+    ],
+    'general': [
+        "Taking care of plants can improve your mood and reduce stress levels.",
+        "Consider keeping a plant journal to track growth and changes over time.",
+        "Talking to your plants might sound silly, but the extra CO2 can actually help them grow!"
+    ]
+}
+
+class AdviceCache:
+    """Per-worker cache of each user's advice, tagged with their garden version
+
+    An entry is only served for the garden version it was computed at, so a
+    write that bumps the version (see bump_garden_version()) makes every
+    worker recompute the advice instead of serving its own stale copy.
+    """
+
+    def __init__(self, max_entries=MAX_CACHED_USERS):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            entry_version, expires_at, suggestions = entry
+            if entry_version != version or expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return suggestions
+
+    def set(self, user_id, version, suggestions, timeout):
+        with self._lock:
+            # Never replace advice computed at a newer version
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > version:
+                return
+            self._entries[user_id] = (version, time.monotonic() + timeout, suggestions)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Per-user advice computed by build_advice()
+advice_cache = AdviceCache()
+
+def suggestion(topic, priority, advice, plant_id=None):
+    return {'topic': topic, 'priority': round(priority), 'advice': advice, 'plantId': plant_id}
+
+def plant_suggestions(plants, now):
+    """Rank advice about each plant's watering, health and stage"""
+    from models import PlantStage
+
+    suggestions = []
+    for plant in plants:
+        if plant.stage == PlantStage.DEAD.value:
+            continue
+
+        if plant.last_watered is not None:
+            dry_days = (now - plant.last_watered).days
+            if dry_days >= DRY_DAYS:
+                suggestions.append(suggestion(
+                    'watering', min(90, 40 + dry_days * 10),
+                    f"{plant.name} hasn't been watered in {dry_days} days. A watering now will perk it right up.",
+                    plant.id
+                ))
+
+        if plant.stage == PlantStage.WITHERING.value:
+            suggestions.append(suggestion(
+                'general', 85,
+                f"{plant.name} is withering. Water it and log a few healthy habits to bring it back.",
+                plant.id
+            ))
+        elif plant.health < 50:
+            suggestions.append(suggestion(
+                'general', 80 - plant.health / 2,
+                f"{plant.name} is at {plant.health:.0f}% health. Logging your water, sleep or sunlight will help it recover.",
+                plant.id
+            ))
+        elif plant.stage == PlantStage.FLOWERING.value:
+            suggestions.append(suggestion(
+                'motivation', 20,
+                f"{plant.name} is flowering. Your consistency is paying off!",
+                plant.id
+            ))
+    return suggestions
+
+def condition_suggestions(daily_totals, goals):
+    """Rank advice about each condition's recent daily average against its goal
+
+    Args:
+        daily_totals: Condition type name -> (days logged, total value)
+        goals: Condition type name -> (default goal, unit)
+    """
+    if not daily_totals:
+        return [suggestion(
+            'motivation', 60,
+            "You haven't logged anything this week. Logging one habit today will give your garden a boost."
+        )]
+
+    suggestions = []
+    for type_name, (days, total) in daily_totals.items():
+        goal, unit = goals.get(type_name, (None, ''))
+        if not goal:
+            continue
+
+        average = total / days
+        label = type_name.replace('_', ' ')
+        topic = CONDITION_TOPICS.get(type_name, 'motivation')
+        ratio = average / goal
+        if ratio < GOAL_SHORTFALL:
+            suggestions.append(suggestion(
+                topic, 30 + 50 * (1 - ratio),
+                f"You've averaged {average:.1f} {unit} of {label} on the days you logged it this week, "
+                f"short of your goal of {goal:g}. Try adding a little more each day."
+            ))
+        else:
+            suggestions.append(suggestion(
+                topic, 10,
+                f"You're meeting your {label} goal this week. Keep it up!"
+            ))
+    return suggestions
+
+def build_advice(user_id):
+    """Compute a user's ranked advice from their plants and recent conditions
+
+    Runs two small queries (plants and one aggregate over the last
+    HISTORY_DAYS of conditions) plus the condition goals.
+    """
+    from sqlalchemy import func, or_
+    from app import db
+    from models import Plant, Condition, ConditionType
+
+    now = datetime.now()
+    plants = db.session.execute(
+        db.select(Plant.id, Plant.name, Plant.stage, Plant.health, Plant.last_watered)
+        .where(Plant.user_id == user_id)
+    ).all()
+
+    daily_totals = {
+        type_name: (days, total)
+        for type_name, days, total in db.session.execute(
+            db.select(
+                Condition.type_name,
+                func.count(func.distinct(func.date(Condition.date_logged))),
+                func.sum(Condition.value)
+            )
+            .where(Condition.user_id == user_id, Condition.date_logged >= now - timedelta(days=HISTORY_DAYS))
+            .group_by(Condition.type_name)
+        )
+    }
+
+    goals = {
+        name: (goal, unit)
+        for name, goal, unit in db.session.execute(
+            db.select(ConditionType.name, ConditionType.default_goal, ConditionType.unit)
+            .where(or_(ConditionType.user_id.is_(None), ConditionType.user_id == user_id))
+        )
+    }
+
+    suggestions = plant_suggestions(plants, now) + condition_suggestions(daily_totals, goals)
+    suggestions.sort(key=lambda s: s['priority'], reverse=True)
+    return suggestions
+
+def get_garden_version(user_id):
+    """Get the version of a user's garden, 0 if the user has no row"""
+    from app import db
+    from models import User
+
+    version = db.session.scalar(db.select(User.garden_version).where(User.id == user_id))
+    return version or 0
+
+def bump_garden_version(user_id):
+    """Invalidate a user's cached advice on every worker
+
+    Call in the transaction of every write that changes the user's plants,
+    conditions or goals, and refresh_advice() once it has been committed.
+    """
+    from app import db
+    from models import User
+
+    db.session.execute(
+        db.update(User)
+        .where(User.id == user_id)
+        .values(garden_version=User.garden_version + 1)
+    )
+
+def cache_advice(app, user_id, version=None):
+    # The version is read before the data, so advice is never cached
+    # under a version newer than the data it was built from
+    if version is None:
+        version = get_garden_version(user_id)
+    suggestions = build_advice(user_id)
+    advice_cache.set(str(user_id), version, suggestions, app.config['ADVICE_CACHE_TIMEOUT'])
+    return suggestions
+
+def get_advice(user_id):
+    """Get a user's ranked advice, computing it only if it isn't cached at the current garden version"""
+    from flask import current_app
+
+    version = get_garden_version(user_id)
+    suggestions = advice_cache.get(str(user_id), version)
+    if suggestions is None:
+        suggestions = cache_advice(current_app, user_id, version)
+    return suggestions
+
+class AdviceRefresher:
+    """Recomputes users' advice on a background thread after their data changes
+
+    Requests for the same user queued before the thread gets to them are
+    merged, so a burst of writes costs one recomputation.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def schedule(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            # Started on first use, and again in a worker forked from a preloaded parent
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pending = set()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self.run, name='advice-refresher', daemon=True)
+                self._thread.start()
+            if user_id in self._pending:
+                return
+            self._pending.add(user_id)
+        self._queue.put(user_id)
+
+    def run(self):
+        while True:
+            user_id = self._queue.get()
+            with self._lock:
+                self._pending.discard(user_id)
+            try:
+                with self.app.app_context():
+                    cache_advice(self.app, user_id)
+            except Exception as e:
+                logging.error(f"Error refreshing advice for user {user_id}: {str(e)}")
+
+_refresher = None
+
+def refresh_advice(user_id):
+    """Recompute a user's advice in the background, call after writes that affect it"""
+    if _refresher is not None:
+        _refresher.schedule(user_id)
+
+def init_plant_advisor(app):
+    """Set up the advice cache (ADVICE_CACHE_TIMEOUT seconds) and its background refresher"""
+    global _refresher
+    app.config.setdefault('ADVICE_CACHE_TIMEOUT', float(os.environ.get('ADVICE_CACHE_TIMEOUT', DEFAULT_ADVICE_TIMEOUT)))
+    _refresher = AdviceRefresher(app)
@@ -0,0 +1,92 @@
+import logging
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# A statement repeated this many times in one request is reported as a possible N+1
+DEFAULT_REPEAT_THRESHOLD = 5
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST_RE = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement):
+    """Normalize a SQL statement so repeats with different values compare equal
+
+    Literals become ?, parameter lists of any length become (?...) and
+    whitespace is collapsed.
+    """
+    normalized = _STRING_LITERAL_RE.sub('?', statement)
+    normalized = _NUMBER_LITERAL_RE.sub('?', normalized)
+    normalized = _PARAMETER_LIST_RE.sub('(?...)', normalized)
+    return _WHITESPACE_RE.sub(' ', normalized).strip()
+
+def env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+def start_query_tracking():
+    g.query_fingerprints = Counter()
+
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    # Queries can also run outside of requests (CLI commands, startup)
+    if g and 'query_fingerprints' in g:
+        g.query_fingerprints[fingerprint(statement)] += 1
+
+def report_queries(response, app):
+    fingerprints = g.pop('query_fingerprints', None)
+    if fingerprints is None:
+        return response
+
+    query_count = sum(fingerprints.values())
+    threshold = app.config['QUERY_TRACKER_THRESHOLD']
+    route = request.url_rule.rule if request.url_rule else request.path
+
+    for statement, count in fingerprints.most_common():
+        if count < threshold:
+            break
+        logging.warning(
+            f"Possible N+1 query in {request.method} {route}: "
+            f"statement ran {count} times ({query_count} queries in total): {statement[:300]}"
+        )
+
+    if app.config['QUERY_TRACKER_HEADERS']:
+        response.headers['X-Query-Count'] = str(query_count)
+        # Database time is recorded by the metrics module
+        db_time_ms = g.get('metrics_db_time', 0.0) * 1000
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={db_time_ms:.2f};desc="{query_count} queries"'
+        )
+
+    return response
+
+def init_query_tracker(app):
+    """Count and fingerprint the SQL statements run by each request
+
+    Repeated fingerprints above QUERY_TRACKER_THRESHOLD are logged as possible
+    N+1 queries. With QUERY_TRACKER_HEADERS the response also carries
+    X-Query-Count and Server-Timing headers. Enabled by QUERY_TRACKER_ENABLED
+    and on by default in debug mode.
+    """
+    app.config.setdefault('QUERY_TRACKER_ENABLED', env_flag('QUERY_TRACKER_ENABLED', app.debug))
+    app.config.setdefault('QUERY_TRACKER_HEADERS', env_flag('QUERY_TRACKER_HEADERS'))
+    app.config.setdefault(
+        'QUERY_TRACKER_THRESHOLD',
+        int(os.environ.get('QUERY_TRACKER_THRESHOLD', DEFAULT_REPEAT_THRESHOLD))
+    )
+
+    if not app.config['QUERY_TRACKER_ENABLED']:
+        return
+
+    app.before_request(start_query_tracking)
+    app.after_request(lambda response: report_queries(response, app))
+    event.listen(Engine, 'before_cursor_execute', count_statement)
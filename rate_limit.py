@@ -0,0 +1,222 @@
+import logging
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, jsonify, request, session
+
+# Buckets kept per worker by the in-memory store before the least recently
+# used ones are evicted (an evicted bucket simply starts full again)
+MAX_MEMORY_BUCKETS = 10000
+
+# Idle connections the SQLite store keeps open per worker
+SQLITE_POOL_SIZE = 4
+
+def refill(tokens, updated_at, now, capacity, refill_rate):
+    """Get the number of tokens in a bucket after refilling it up to now"""
+    return min(capacity, tokens + max(0.0, now - updated_at) * refill_rate)
+
+def take(tokens, capacity, refill_rate, cost):
+    """Try to take tokens from a refilled bucket
+
+    Returns:
+        Tuple of (allowed, remaining tokens, seconds until the request would be allowed)
+    """
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / refill_rate
+
+class MemoryBucketStore:
+    """Token buckets kept in the memory of the current worker process"""
+
+    def __init__(self, max_buckets=MAX_MEMORY_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        """Take tokens from a bucket, returns (allowed, retry_after)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = refill(tokens, updated_at, now, capacity, refill_rate)
+            allowed, tokens, retry_after = take(tokens, capacity, refill_rate, cost)
+
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+
+        return allowed, retry_after
+
+class SQLiteBucketStore:
+    """Token buckets shared by all workers on a host through a SQLite file
+
+    Connections are pooled per process rather than kept per thread, because
+    thread-local state is greenlet-local under the gevent worker and every
+    request would open a new connection. The schema is set up once per process.
+    """
+
+    def __init__(self, path, pool_size=SQLITE_POOL_SIZE):
+        self.path = path
+        self.pool_size = pool_size
+        self._pool = queue.LifoQueue()
+        self._pid = os.getpid()
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            if not self._schema_ready:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """)
+                self._schema_ready = True
+        return connection
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection, a new one is opened when none is free"""
+        if self._pid != os.getpid():
+            # Connections opened before a fork stay with the parent
+            self._pool = queue.LifoQueue()
+            self._pid = os.getpid()
+
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+
+        try:
+            yield connection
+        except Exception:
+            connection.close()
+            raise
+
+        if self._pool.qsize() < self.pool_size:
+            self._pool.put(connection)
+        else:
+            connection.close()
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        """Take tokens from a bucket, returns (allowed, retry_after)"""
+        # Wall clock time, monotonic clocks are not comparable between processes
+        now = time.time()
+        with self.connection() as connection:
+            # BEGIN IMMEDIATE takes the write lock so the read-modify-write is atomic
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated_at = row if row else (capacity, now)
+                tokens = refill(tokens, updated_at, now, capacity, refill_rate)
+                allowed, tokens, retry_after = take(tokens, capacity, refill_rate, cost)
+
+                connection.execute(
+                    "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                    (key, tokens, now)
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+        return allowed, retry_after
+
+_store = None
+_store_lock = threading.Lock()
+
+def create_store(storage):
+    """Create a bucket store from a RATE_LIMIT_STORAGE value
+
+    Args:
+        storage: "memory" for per-worker buckets or "sqlite:///path/to/file.db"
+            for buckets shared by every worker on the host
+    """
+    if storage.startswith('sqlite:///'):
+        path = storage[len('sqlite:///'):]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return SQLiteBucketStore(path)
+
+    if storage != 'memory':
+        logging.warning(f"Unknown RATE_LIMIT_STORAGE {storage}, using in-memory rate limiting")
+    return MemoryBucketStore()
+
+def get_store():
+    """Get the bucket store configured for the app"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_store(current_app.config.get('RATE_LIMIT_STORAGE', 'memory'))
+    return _store
+
+def get_client_identity(scope):
+    """Get the identity a bucket is kept for
+
+    The "user" scope falls back to the client IP for anonymous requests.
+    """
+    if scope == 'user' and session.get('user_id'):
+        return f"user:{session['user_id']}"
+    return f"ip:{request.remote_addr}"
+
+def rate_limit(limit, period, scope='ip', burst=None, name=None):
+    """Limit how often a client can call a view
+
+    The check runs before the view, so a limited request never reaches
+    password hashing or request body decoding. Decorators can be stacked to
+    combine a per-IP and a per-user limit.
+
+    Args:
+        limit: Number of requests allowed per period
+        period: Length of the period in seconds
+        scope: "ip" to limit per client IP or "user" to limit per logged-in user
+        burst: Bucket capacity, defaults to limit
+        name: Bucket name, defaults to the view name
+    """
+    capacity = burst or limit
+    refill_rate = limit / period
+
+    def decorator(f):
+        bucket_name = name or f.__name__
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not current_app.config.get('RATE_LIMIT_ENABLED', True):
+                return f(*args, **kwargs)
+
+            key = f"{bucket_name}:{get_client_identity(scope)}"
+            try:
+                allowed, retry_after = get_store().consume(key, capacity, refill_rate)
+            except Exception as e:
+                # Never turn a rate limiter failure into an outage
+                logging.error(f"Rate limit check failed for {key}: {str(e)}")
+                return f(*args, **kwargs)
+
+            if not allowed:
+                response = jsonify({
+                    'success': False,
+                    'message': 'Too many requests. Please try again later.',
+                    'code': 'rate_limited'
+                })
+                response.status_code = 429
+                response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+                return response
+
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
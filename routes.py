@@ -1,11 +1,20 @@
-from flask import render_template, request, redirect, url_for, flash, session, jsonify
+from flask import render_template, request, redirect, url_for, flash, session, jsonify, Response
 from flask_login import login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy import func
+from sqlalchemy import func, or_
 from app import app, db
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from models import PlantType, User, Plant, Condition, ConditionType, PlantStage, generate_uuid
+from serializers import PLANT_FIELDS, CONDITION_FIELDS, parse_fields, select_columns, serialize_rows
+from garden_events import hub, publish_plant, publish_credits
+from write_queue import submit_write, on_commit, WriteTimeout, write_timeout_response
+from achievements import record_event
+from plant_advisor import bump_garden_version, refresh_advice
+from template_cache import cache_anonymous_page
+from db_routing import use_replica
+from condition_heatmap import MAX_DAYS, build_heatmap, day_boundaries
 
 # Authentication routes
 @app.route('/register', methods=['GET'])
@@ -53,6 +62,7 @@ def register():
         return jsonify({'success': False, 'message': str(e)}), 400
 
 @app.route('/login', methods=['GET'])
+@cache_anonymous_page()
 def login_page():
     if current_user.is_authenticated:
         return redirect(url_for('garden_page'))
@@ -88,6 +98,7 @@ def logout():
 
 # Garden routes
 @app.route('/')
+@cache_anonymous_page()
 def index():
     return render_template('index.html')
 
@@ -110,23 +121,19 @@ def profile_page():
 # API routes
 @app.route('/api/plants', methods=['GET'])
 @login_required
+@use_replica
 def get_plants():
-    plants = Plant.query.filter_by(user_id=current_user.id).all()
+    try:
+        fields = parse_fields(PLANT_FIELDS)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
-    plants_data = []
-    for plant in plants:
-        plants_data.append({
-            'id': plant.id,
-            'name': plant.name,
-            'type': plant.plant_type,
-            'stage': plant.stage,
-            'health': plant.health,
-            'progress': plant.progress,
-            'created_at': plant.created_at.isoformat() if hasattr(plant.created_at, 'isoformat') else str(plant.created_at),
-            'last_watered': plant.last_watered.isoformat() if hasattr(plant.last_watered, 'isoformat') else str(plant.last_watered)
-        })
+    # Only select the requested columns
+    plants = db.session.query(*select_columns(PLANT_FIELDS, fields)).filter(
+        Plant.user_id == current_user.id
+    ).all()
     
-    return jsonify({'success': True, 'plants': plants_data})
+    return jsonify({'success': True, 'plants': serialize_rows(plants, fields)})
 
 @app.route('/api/plants', methods=['POST'])
 @login_required
@@ -153,7 +160,10 @@ def create_plant():
     
     # Add to database
     db.session.add(new_plant)
+    bump_garden_version(current_user.id)
     db.session.commit()
+    publish_plant(new_plant)
+    refresh_advice(current_user.id)
     
     # Award garden score for creating a new plant
     points = 100
@@ -174,19 +184,87 @@ def create_plant():
 
 @app.route('/api/conditions', methods=['GET'])
 @login_required
+@use_replica
 def get_conditions():
-    conditions = Condition.query.filter_by(user_id=current_user.id).order_by(Condition.date_logged.desc()).limit(10).all()
-    
-    conditions_data = []
-    for condition in conditions:
-        conditions_data.append({
-            'id': condition.id,
-            'type_name': condition.type_name,
-            'value': condition.value,
-            'date_logged': condition.date_logged.isoformat() if hasattr(condition.date_logged, 'isoformat') else str(condition.date_logged)
-        })
+    try:
+        fields = parse_fields(CONDITION_FIELDS)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    # Only select the requested columns
+    conditions = db.session.query(*select_columns(CONDITION_FIELDS, fields)).filter(
+        Condition.user_id == current_user.id
+    ).order_by(Condition.date_logged.desc()).limit(10).all()
     
-    return jsonify({'success': True, 'conditions': conditions_data})
+    return jsonify({'success': True, 'conditions': serialize_rows(conditions, fields)})
+
+@app.route('/api/conditions/heatmap', methods=['GET'])
+@login_required
+@use_replica
+def get_condition_heatmap():
+    """Get a condition's daily totals, goal attainment and trend for a calendar heatmap
+    
+    Query parameters: type (required), from and to (YYYY-MM-DD, inclusive,
+    default the last 365 days) and tz (IANA timezone the days are in,
+    default UTC).
+    """
+    type_name = request.args.get('type')
+    if not type_name:
+        return jsonify({'success': False, 'message': 'Condition type is required'}), 400
+    
+    try:
+        tz = ZoneInfo(request.args.get('tz', 'UTC'))
+    except (ZoneInfoNotFoundError, ValueError):
+        return jsonify({'success': False, 'message': 'Unknown timezone'}), 400
+    
+    try:
+        end = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else datetime.now(tz).date()
+        start = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else end - timedelta(days=364)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Dates must be YYYY-MM-DD'}), 400
+    
+    days = (end - start).days + 1
+    if days < 1 or days > MAX_DAYS:
+        return jsonify({'success': False, 'message': f'The range must be 1 to {MAX_DAYS} days'}), 400
+    
+    # The user's own condition type overrides the system one of the same name
+    condition_type = db.session.query(ConditionType.default_goal, ConditionType.unit).filter(
+        ConditionType.name == type_name,
+        or_(ConditionType.user_id.is_(None), ConditionType.user_id == current_user.id)
+    ).order_by(ConditionType.user_id.is_(None)).first()
+    goal, unit = condition_type if condition_type else (None, None)
+    
+    # date_logged is a naive timestamp in the server's local time, the database
+    # turns it into epoch seconds as if it were UTC, so the day boundaries are
+    # converted the same way
+    boundaries = [
+        datetime.fromtimestamp(boundary).replace(tzinfo=timezone.utc).timestamp()
+        for boundary in day_boundaries(start, days, tz)
+    ]
+    
+    # One query for the two columns over the index range of this condition type
+    rows = db.session.execute(
+        db.select(func.extract('epoch', Condition.date_logged), Condition.value).where(
+            Condition.user_id == current_user.id,
+            Condition.type_name == type_name,
+            Condition.date_logged >= datetime.fromtimestamp(boundaries[0], timezone.utc).replace(tzinfo=None),
+            Condition.date_logged < datetime.fromtimestamp(boundaries[-1], timezone.utc).replace(tzinfo=None)
+        )
+    ).all()
+    timestamps, values = zip(*rows) if rows else ((), ())
+    
+    heatmap = build_heatmap(timestamps, values, start, days, tz, goal, boundaries)
+    
+    return jsonify({
+        'success': True,
+        'type': type_name,
+        'unit': unit,
+        'goal': goal,
+        'timezone': str(tz),
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        **heatmap
+    })
 
 @app.route('/api/conditions', methods=['POST'])
 @login_required
@@ -203,26 +281,52 @@ def log_condition():
     except ValueError:
         return jsonify({'success': False, 'message': 'Value must be a number'}), 400
     
+    # Applied by the group-commit writer when the write queue is enabled
+    try:
+        payload, status = submit_write(log_condition_write, current_user.id, type_name, value)
+    except WriteTimeout as e:
+        logging.warning(f"Timed out logging condition: {str(e)}")
+        return write_timeout_response(e)
+    except Exception as e:
+        logging.error(f"Error logging condition: {str(e)}")
+        return jsonify({'success': False, 'message': 'Error logging condition'}), 500
+    
+    return jsonify(payload), status
+
+def log_condition_write(user_id, type_name, value):
+    """Write intent for logging a condition, see write_queue.submit_write"""
+    # Reload rather than trusting objects loaded earlier in the request
+    user = db.session.get(User, user_id, populate_existing=True)
+    
     # Create new condition
     new_condition = Condition(
         id=None,  # Auto-incremented
-        user_id=current_user.id,
+        user_id=user_id,
         type_name=type_name,
         value=value
     )
-    
-    # Add to database
     db.session.add(new_condition)
-    db.session.commit()
     
     # Apply condition to plants
-    apply_condition_to_plants(current_user.id, type_name, value)
+    plants, advanced = apply_condition_effects(user_id, type_name, value)
+    for plant in plants:
+        on_commit(publish_plant, plant)
     
     # Award garden score for logging a condition (points based on value)
     score_points = min(int(value * 5), 50)  # Cap at 50 points per condition
-    current_user.increase_garden_score(score_points, f"Logged {type_name} condition")
+    user.increase_garden_score(score_points, f"Logged {type_name} condition", commit=False)
+    on_commit(record_event, user_id, 'condition_logged', {
+        'stage_advanced': len(advanced),
+        'max_growth': sum(1 for plant in advanced if plant.stage == PlantStage.FLOWERING.value),
+        'garden_score': user.garden_score
+    })
+    bump_garden_version(user_id)
+    on_commit(refresh_advice, user_id)
     
-    return jsonify({
+    # Assigns the condition id and date
+    db.session.flush()
+    
+    return {
         'success': True, 
         'message': f'Condition logged! Earned {score_points} garden score points!',
         'condition': {
@@ -231,15 +335,19 @@ def log_condition():
             'value': new_condition.value,
             'date_logged': new_condition.date_logged.isoformat() if hasattr(new_condition.date_logged, 'isoformat') else str(new_condition.date_logged)
         },
-        'garden_score': current_user.garden_score
-    })
+        'garden_score': user.garden_score
+    }, 200
 
 @app.route('/api/condition-types', methods=['GET'])
 @login_required
 def get_condition_types():
+    return jsonify({'success': True, 'condition_types': get_condition_types_data(current_user.id)})
+
+def get_condition_types_data(user_id):
+    """Get the system and user-defined condition types available to a user"""
     # Get system condition types (user_id is NULL) and user-defined condition types
     condition_types = ConditionType.query.filter(
-        (ConditionType.user_id == None) | (ConditionType.user_id == current_user.id)
+        (ConditionType.user_id == None) | (ConditionType.user_id == user_id)
     ).all()
     
     # Group by lowercase name to eliminate duplicates
@@ -270,7 +378,7 @@ def get_condition_types():
     # Sort by name for consistent display
     types_data.sort(key=lambda x: x['display_name'])
     
-    return jsonify({'success': True, 'condition_types': types_data})
+    return types_data
 
 @app.route('/api/condition-types', methods=['POST'])
 @login_required
@@ -310,9 +418,11 @@ def create_condition_type():
         user_id=current_user.id
     )
     
-    # Add to database
+    # Add to database (its goal is part of the user's advice)
     db.session.add(new_condition_type)
+    bump_garden_version(current_user.id)
     db.session.commit()
+    refresh_advice(current_user.id)
     
     # Create a formatted display name
     display_name = name.replace('_', ' ').title()
@@ -331,32 +441,49 @@ def create_condition_type():
     })
 
 # Plant growth logic
+def apply_condition_effects(user_id, condition_type, value):
+    """Apply a logged condition to all plants of the user without committing
+    
+    Returns:
+        Tuple of (updated plants, plants that advanced a stage)
+    """
+    plants = Plant.query.filter_by(user_id=user_id).all()
+    advanced = []
+    
+    for plant in plants:
+        # Calculate effect on health and progress based on condition type and value
+        health_change, progress_change = calculate_condition_effect(condition_type, value)
+        
+        # Update plant health
+        plant.health = min(100, max(0, plant.health + health_change))
+        
+        # Update plant progress and potentially advance stage
+        plant.progress += progress_change
+        
+        # Check if plant should advance to next stage
+        if plant.progress >= 100 and plant.stage < PlantStage.DEAD.value:
+            plant.progress = 0
+            plant.stage = min(PlantStage.DEAD.value, plant.stage + 1)
+            advanced.append(plant)
+        
+        # Update last_watered time for water_intake condition
+        if condition_type == 'water_intake':
+            plant.last_watered = datetime.now()
+    
+    return plants, advanced
+
 def apply_condition_to_plants(user_id, condition_type, value):
     """Apply a logged condition to all plants of the user"""
     try:
-        plants = Plant.query.filter_by(user_id=user_id).all()
-        
-        for plant in plants:
-            # Calculate effect on health and progress based on condition type and value
-            health_change, progress_change = calculate_condition_effect(condition_type, value)
-            
-            # Update plant health
-            plant.health = min(100, max(0, plant.health + health_change))
-            
-            # Update plant progress and potentially advance stage
-            plant.progress += progress_change
-            
-            # Check if plant should advance to next stage
-            if plant.progress >= 100 and plant.stage < PlantStage.DEAD.value:
-                plant.progress = 0
-                plant.stage = min(PlantStage.DEAD.value, plant.stage + 1)
-            
-            # Update last_watered time for water_intake condition
-            if condition_type == 'water_intake':
-                plant.last_watered = datetime.now()
+        plants, _ = apply_condition_effects(user_id, condition_type, value)
+        bump_garden_version(user_id)
         
         # Save all plant changes
         db.session.commit()
+        
+        for plant in plants:
+            publish_plant(plant)
+        refresh_advice(user_id)
     except Exception as e:
         db.session.rollback()
         logging.error(f"Failed to apply condition to plants: {str(e)}")
@@ -393,10 +520,13 @@ def calculate_condition_effect(condition_type, value):
     
     return health_change, progress_change
 
+def get_plant_types_data():
+    """Get the available plant types"""
+    return [{'value': pt.value, 'name': pt.name} for pt in PlantType]
+
 @app.route('/api/plant-types', methods=['GET'])
 def get_plant_types():
-    plant_types = [{'value': pt.value, 'name': pt.name} for pt in PlantType]
-    return jsonify({'success': True, 'plant_types': plant_types})
+    return jsonify({'success': True, 'plant_types': get_plant_types_data()})
 
 # Water credits API routes
 @app.route('/api/water-credits', methods=['GET'])
@@ -419,6 +549,56 @@ def get_garden_score():
         'level': score_data['label']
     })
 
+@app.route('/api/garden/bootstrap', methods=['GET'])
+@login_required
+def get_garden_bootstrap():
+    """Get everything the garden page needs on load in a single response
+    
+    Combines /api/water-credits, /api/plant-types, /api/plants, /api/garden-score
+    and /api/condition-types. The user row is loaded once by Flask-Login, so this
+    only costs one query for the plants and one for the condition types.
+    """
+    plants = db.session.query(*select_columns(PLANT_FIELDS, PLANT_FIELDS)).filter(
+        Plant.user_id == current_user.id
+    ).all()
+    score_data = current_user.get_garden_score()
+    
+    response = jsonify({
+        'success': True,
+        'water_credits': current_user.water_credits,
+        'plant_types': get_plant_types_data(),
+        'plants': serialize_rows(plants, PLANT_FIELDS),
+        'garden_score': score_data['score'],
+        'level': score_data['label'],
+        'condition_types': get_condition_types_data(current_user.id)
+    })
+    
+    return make_garden_response(response)
+
+def make_garden_response(response):
+    """Tag a garden response with an ETag so unchanged gardens return 304"""
+    response.add_etag()
+    # Private to the user, but the browser may reuse it after revalidating
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+@app.route('/api/garden/stream', methods=['GET'])
+@login_required
+def garden_stream():
+    """Stream live plant, credit and achievement changes as Server-Sent Events
+    
+    The stream never touches the database, so an idle connection only holds
+    its event queue. Run gunicorn with the gevent worker to serve many of them.
+    """
+    return Response(
+        hub.stream(current_user.id),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Disable proxy buffering
+        }
+    )
+
 @app.route('/api/water-credits/add', methods=['POST'])
 @login_required
 def add_water_credits():
@@ -428,6 +608,7 @@ def add_water_credits():
     # Add credits
     current_user.water_credits += amount
     db.session.commit()
+    publish_credits(current_user)
     
     return jsonify({
         'success': True,
@@ -451,6 +632,7 @@ def use_water_credits():
     # Use credits
     current_user.water_credits -= amount
     db.session.commit()
+    publish_credits(current_user)
     
     return jsonify({
         'success': True,
@@ -461,31 +643,46 @@ def use_water_credits():
 @app.route('/api/water-plant/<int:plant_id>', methods=['POST'])
 @login_required
 def water_plant(plant_id):
-    # Get the plant
-    plant = Plant.query.get(plant_id)
+    # Applied by the group-commit writer when the write queue is enabled
+    try:
+        payload, status = submit_write(water_plant_write, current_user.id, plant_id)
+    except WriteTimeout as e:
+        logging.warning(f"Timed out watering plant: {str(e)}")
+        return write_timeout_response(e)
+    except Exception as e:
+        logging.error(f"Error watering plant: {str(e)}")
+        return jsonify({'success': False, 'message': 'Error watering plant'}), 500
+    
+    return jsonify(payload), status
+
+def water_plant_write(user_id, plant_id):
+    """Write intent for watering a plant, see write_queue.submit_write"""
+    # Get the plant (reloaded rather than trusting objects loaded earlier in the request)
+    plant = db.session.get(Plant, plant_id, populate_existing=True)
     
     if not plant:
-        return jsonify({
+        return {
             'success': False,
             'message': 'Plant not found!'
-        }), 404
+        }, 404
     
     # Check if the plant belongs to the current user
-    if plant.user_id != current_user.id:
-        return jsonify({
+    if plant.user_id != user_id:
+        return {
             'success': False,
             'message': 'You do not own this plant!'
-        }), 403
+        }, 403
     
     # Check if user has water credits
-    if current_user.water_credits < 1:
-        return jsonify({
+    user = db.session.get(User, user_id, populate_existing=True)
+    if user.water_credits < 1:
+        return {
             'success': False,
             'message': 'Not enough water credits!'
-        }), 400
+        }, 400
     
     # Use water credit
-    current_user.water_credits -= 1
+    user.water_credits -= 1
     
     # Update plant
     plant.last_watered = datetime.now()
@@ -498,22 +695,20 @@ def water_plant(plant_id):
     plant.progress += 5
     
     # Check if plant should advance to next stage
+    stage_advanced = False
     if plant.progress >= 100 and plant.stage < PlantStage.DEAD.value:
         plant.progress = 0
         plant.stage = min(PlantStage.DEAD.value, plant.stage + 1)
-    
-    # Save changes
-    db.session.commit()
+        stage_advanced = True
     
     # Log water condition
     new_condition = Condition(
         id=None,
-        user_id=current_user.id,
+        user_id=user_id,
         type_name='water_intake',
         value=1
     )
     db.session.add(new_condition)
-    db.session.commit()
     
     # Award garden score for watering plants
     # Extra points if plant was unhealthy or advanced to next stage
@@ -527,12 +722,23 @@ def water_plant(plant_id):
         bonus_points += 25
         
     total_points = base_points + bonus_points
-    current_user.increase_garden_score(total_points, f"Watered {plant.name}")
+    user.increase_garden_score(total_points, f"Watered {plant.name}", commit=False)
+    
+    # Published once everything is committed
+    on_commit(publish_plant, plant)
+    on_commit(publish_credits, user)
+    on_commit(record_event, user_id, 'plant_watered', {
+        'stage_advanced': stage_advanced,
+        'max_growth': stage_advanced and plant.stage == PlantStage.FLOWERING.value,
+        'garden_score': user.garden_score
+    })
+    bump_garden_version(user_id)
+    on_commit(refresh_advice, user_id)
     
-    return jsonify({
+    return {
         'success': True,
-        'water_credits': current_user.water_credits,
-        'garden_score': current_user.garden_score,
+        'water_credits': user.water_credits,
+        'garden_score': user.garden_score,
         'plant': {
             'id': plant.id,
             'name': plant.name,
@@ -543,7 +749,7 @@ def water_plant(plant_id):
             'last_watered': plant.last_watered.isoformat() if hasattr(plant.last_watered, 'isoformat') else str(plant.last_watered)
         },
         'message': f'{plant.name} has been watered! Earned {total_points} garden score points!'
-    })
+    }, 200
 
 # Sample plants API routes
 @app.route('/api/preset-plants', methods=['POST'])
@@ -563,6 +769,7 @@ def add_preset_plants():
     }
     
     plants_added = []
+    new_plants = []
     
     # If a specific type was requested, only add that one
     if selected_type and selected_type in preset_plants:
@@ -599,11 +806,17 @@ def add_preset_plants():
         )
         
         db.session.add(new_plant)
+        new_plants.append(new_plant)
         plants_added.append(plant_data["name"])
     
     # Commit changes
+    bump_garden_version(current_user.id)
     db.session.commit()
     
+    for new_plant in new_plants:
+        publish_plant(new_plant)
+    refresh_advice(current_user.id)
+    
     # Award garden score for adding preset plants (50 points per plant)
     points_per_plant = 50
     total_points = len(plants_added) * points_per_plant
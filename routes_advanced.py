@@ -6,6 +6,10 @@ import time
 from datetime import datetime, timedelta
 import random
 from functools import wraps
+from journal_store import JournalStore, DEFAULT_COMPACT_EVERY
+from achievements import ACHIEVEMENTS, apply_event, is_server_evaluated
+import streaks
+from plant_advisor import GENERAL_TIPS, get_advice
 
 # Create blueprint
 advanced_bp = Blueprint('advanced', __name__)
@@ -33,70 +37,33 @@ MOCK_DATA = {
     'rewards': []
 }
 
-# Load mock data from JSON files if they exist
-def load_mock_data():
-    data_dir = os.path.join(os.path.dirname(__file__), 'mock_data')
-    os.makedirs(data_dir, exist_ok=True)
-    
-    for key in MOCK_DATA.keys():
-        file_path = os.path.join(data_dir, f'{key}.json')
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    MOCK_DATA[key] = json.load(f)
-                logging.info(f"Loaded mock data for {key}")
-            except Exception as e:
-                logging.error(f"Error loading mock data for {key}: {str(e)}")
+# Mock data is persisted as snapshots plus an append-only journal, so each
+# change only appends one record instead of rewriting every file. The store
+# is shared by all gunicorn workers: reads pick up the other workers' changes
+# and user data is changed with update_user_data() under the store's lock.
+MOCK_DATA_DIR = os.path.join(os.path.dirname(__file__), 'mock_data')
+store = JournalStore(
+    MOCK_DATA_DIR,
+    MOCK_DATA,
+    compact_every=int(os.environ.get('MOCK_DATA_COMPACT_EVERY', DEFAULT_COMPACT_EVERY)),
+    # Plants and habits are looked up by owner through an index
+    indexes={'plants': 'userId', 'habits': 'userId'}
+)
 
-# Save mock data to JSON files
-def save_mock_data():
-    data_dir = os.path.join(os.path.dirname(__file__), 'mock_data')
-    os.makedirs(data_dir, exist_ok=True)
-    
-    for key, data in MOCK_DATA.items():
-        file_path = os.path.join(data_dir, f'{key}.json')
-        try:
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
-            logging.info(f"Saved mock data for {key}")
-        except Exception as e:
-            logging.error(f"Error saving mock data for {key}: {str(e)}")
+# Load mock data from the snapshots and journal if they exist
+def load_mock_data():
+    store.load()
 
 # Initialize mock data
 def init_mock_data():
-    # Only initialize if data doesn't exist
-    if not MOCK_DATA['achievements']:
-        # Sample achievements
-        MOCK_DATA['achievements'] = [
-            {
-                'id': 'first_plant',
-                'name': 'Green Thumb',
-                'description': 'Add your first plant to the garden',
-                'icon': 'seedling',
-                'xpReward': 50,
-                'criteria': {'type': 'plants_added', 'threshold': 1}
-            },
-            {
-                'id': 'plant_collector',
-                'name': 'Plant Collector',
-                'description': 'Add 5 different plants to your garden',
-                'icon': 'leaf',
-                'xpReward': 100,
-                'criteria': {'type': 'plants_added', 'threshold': 5}
-            },
-            {
-                'id': 'watering_routine',
-                'name': 'Watering Routine',
-                'description': 'Water your plants 10 times',
-                'icon': 'tint',
-                'xpReward': 75,
-                'criteria': {'type': 'watering_count', 'threshold': 10}
-            }
-        ]
+    # Achievement definitions live in the achievement engine, keep the stored copy in sync
+    if store.get('achievements') != ACHIEVEMENTS:
+        store.replace('achievements', ACHIEVEMENTS)
     
-    if not MOCK_DATA['challenges']:
+    # Only initialize if data doesn't exist
+    if not store.get('challenges'):
         # Sample challenges
-        MOCK_DATA['challenges'] = [
+        store.replace('challenges', [
             {
                 'id': 'weekly_watering',
                 'name': 'Weekly Watering',
@@ -117,11 +84,11 @@ def init_mock_data():
                 'duration': 14,
                 'criteria': {'type': 'plant_types', 'threshold': 3}
             }
-        ]
+        ])
     
-    if not MOCK_DATA['rewards']:
+    if not store.get('rewards'):
         # Sample rewards
-        MOCK_DATA['rewards'] = [
+        store.replace('rewards', [
             {
                 'id': 'rare_plant_1',
                 'name': 'Rare Plant: Crystal Rose',
@@ -141,52 +108,89 @@ def init_mock_data():
                 'type': 'theme',
                 'unlockCriteria': {'achievements': 5}
             }
-        ]
-    
-    # Save initialized data
-    save_mock_data()
+        ])
+
+# Data of a user who hasn't used the advanced features yet
+def new_user_data(user_id):
+    return {
+        'id': user_id,
+        'level': 1,
+        'xp': 0,
+        'totalXp': 0,
+        'plantsAdded': 0,
+        'wateringCount': 0,
+        'earliestHabitHour': 8,
+        'latestHabitHour': 22,
+        'plantsAtMaxGrowth': 0,
+        'streaks': {},
+        'achievements': [],
+        'completedChallenges': [],
+        'unlockedRewards': []
+    }
 
 # Get or create user data
 def get_user_data(user_id=None):
     if not user_id:
         user_id = session.get('user_id', 'default_user')
     
-    if user_id not in MOCK_DATA['users']:
+    user_data = store.get('users', user_id)
+    if user_data is None:
         # Create new user data
-        MOCK_DATA['users'][user_id] = {
-            'id': user_id,
-            'level': 1,
-            'xp': 0,
-            'totalXp': 0,
-            'plantsAdded': 0,
-            'wateringCount': 0,
-            'earliestHabitHour': 8,
-            'latestHabitHour': 22,
-            'plantsAtMaxGrowth': 0,
-            'streaks': {},
-            'achievements': [],
-            'completedChallenges': [],
-            'unlockedRewards': []
-        }
-        save_mock_data()
-    
-    return MOCK_DATA['users'][user_id]
-
-# Get or create plant data
-def get_plant_data(plant_id=None):
-    if plant_id and plant_id in MOCK_DATA['plants']:
-        return MOCK_DATA['plants'][plant_id]
+        user_data = store.setdefault('users', user_id, new_user_data(user_id))
     
-    # Return all plants if no ID specified
-    return list(MOCK_DATA['plants'].values())
+    return user_data
 
-# Get or create habit data
-def get_habit_data(habit_id=None):
-    if habit_id and habit_id in MOCK_DATA['habits']:
-        return MOCK_DATA['habits'][habit_id]
-    
-    # Return all habits if no ID specified
-    return list(MOCK_DATA['habits'].values())
+# Change a user's data based on its latest value in the shared store
+def update_user_data(user_id, fn):
+    """Apply fn to a copy of the user's data and store it, under the store's lock
+
+    fn changes the data in place and can return False to leave it unchanged.
+    Another worker can't change the user in between, so no update is lost.
+    """
+    return store.update('users', user_id, fn, default=new_user_data(user_id))
+
+# Get a user's plants, or just the one with plant_id if they own it
+def get_plant_data(user_id, plant_id=None):
+    if plant_id:
+        plant = store.get('plants', plant_id)
+        if plant is not None:
+            return [plant] if plant.get('userId') == user_id else []
+    
+    # Return all of the user's plants if no ID specified
+    return store.find('plants', user_id)
+
+# Get a user's habits, or just the one with habit_id if they own it
+def get_habit_data(user_id, habit_id=None):
+    if habit_id:
+        habit = store.get('habits', habit_id)
+        if habit is not None:
+            return [habit] if habit.get('userId') == user_id else []
+    
+    # Return all of the user's habits if no ID specified
+    return store.find('habits', user_id)
+
+# Completion history of a habit (see streaks), older habits have a list of dates
+def habit_history(habit):
+    if 'completionBitmaps' in habit:
+        return habit['completionBitmaps']
+    return streaks.from_dates(habit.get('completionDates', []))
+
+# Habit as sent to the client, with its recent completion dates and streak statistics
+def serialize_habit(habit, today):
+    habit_data = {key: value for key, value in habit.items() if key != 'completionBitmaps'}
+    history = habit_history(habit)
+    habit_data['completionDates'] = streaks.completion_dates(history, today)
+    habit_data.update(streaks.summarize(history, today))
+    return habit_data
+
+# Parse an ISO date from a request, today if it's missing
+def parse_day(value):
+    if not value:
+        return datetime.now().date()
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
 
 # Initialize data when module is loaded
 load_mock_data()
@@ -208,10 +212,10 @@ def plants_data():
     """Get plant data for advanced features"""
     user_id = session.get('user_id')
     plant_id = request.args.get('id')
-    plants = get_plant_data(plant_id)
+    plants = get_plant_data(user_id, plant_id)
     
     # If no plants exist, create some sample plants
-    if not plants and not plant_id:
+    if not plants and not plant_id and not store.get('plants'):
         sample_plants = [
             {
                 'id': f'plant-1-{user_id}',
@@ -251,18 +255,11 @@ def plants_data():
         ]
         
         for plant in sample_plants:
-            MOCK_DATA['plants'][plant['id']] = plant
+            store.put('plants', plant['id'], plant)
         
-        save_mock_data()
         plants = sample_plants
     
-    # Filter plants by user ID
-    if isinstance(plants, list):
-        plants = [p for p in plants if p.get('userId') == user_id]
-    elif plants and plants.get('userId') != user_id:
-        plants = []
-    
-    return jsonify(plants if isinstance(plants, list) else [plants])
+    return jsonify(plants)
 
 # Habit data endpoint
 @advanced_bp.route('/api/habits/data', methods=['GET'])
@@ -271,11 +268,10 @@ def habits_data():
     """Get habit data for advanced features"""
     user_id = session.get('user_id')
     habit_id = request.args.get('id')
-    habits = get_habit_data(habit_id)
+    habits = get_habit_data(user_id, habit_id)
     
     # If no habits exist, create some sample habits
-    if not habits and not habit_id:
-        today = datetime.now().strftime('%Y-%m-%d')
+    if not habits and not habit_id and not store.get('habits'):
         yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
         
         sample_habits = [
@@ -285,12 +281,11 @@ def habits_data():
                 'description': 'Water plants in the morning',
                 'type': 'daily',
                 'icon': 'tint',
-                'streak': 3,
-                'completionDates': [
+                'completionBitmaps': streaks.from_dates([
                     yesterday,
                     (datetime.now() - timedelta(days=2)).strftime('%Y-%m-%d'),
                     (datetime.now() - timedelta(days=3)).strftime('%Y-%m-%d')
-                ],
+                ]),
                 'preferredTimeStart': 6,
                 'preferredTimeEnd': 10,
                 'tags': ['watering', 'morning', 'plant-care'],
@@ -302,10 +297,9 @@ def habits_data():
                 'description': 'Check if plants are getting enough sunlight',
                 'type': 'daily',
                 'icon': 'sun',
-                'streak': 1,
-                'completionDates': [
+                'completionBitmaps': streaks.from_dates([
                     yesterday
-                ],
+                ]),
                 'preferredTimeStart': 10,
                 'preferredTimeEnd': 14,
                 'tags': ['sunlight', 'plant-care', 'outdoor'],
@@ -314,41 +308,91 @@ def habits_data():
         ]
         
         for habit in sample_habits:
-            MOCK_DATA['habits'][habit['id']] = habit
+            store.put('habits', habit['id'], habit)
         
-        save_mock_data()
         habits = sample_habits
     
-    # Filter habits by user ID
-    if isinstance(habits, list):
-        habits = [h for h in habits if h.get('userId') == user_id]
-    elif habits and habits.get('userId') != user_id:
-        habits = []
+    today = datetime.now().date()
+    return jsonify([serialize_habit(habit, today) for habit in habits])
+
+@advanced_bp.route('/api/habits/<habit_id>/complete', methods=['POST'])
+@login_required
+def complete_habit(habit_id):
+    """Record a habit as completed (or not) on a day"""
+    user_id = session.get('user_id')
+    
+    data = request.json or {}
+    day = parse_day(data.get('date'))
+    completed = bool(data.get('completed', True))
+    
+    if day is None:
+        return jsonify({'success': False, 'message': 'Date must be YYYY-MM-DD'}), 400
+    
+    found = []
+    def record(habit):
+        if habit is None or habit.get('userId') != user_id:
+            return False
+        found.append(True)
+        
+        # Sets one bit, older habits move their list of dates into the bitmaps
+        history = habit_history(habit)
+        streaks.set_day(history, day, completed)
+        habit['completionBitmaps'] = history
+        habit.pop('completionDates', None)
+    
+    habit = store.update('habits', habit_id, record)
+    if not found:
+        return jsonify({'success': False, 'message': 'Habit not found'}), 404
     
-    return jsonify(habits if isinstance(habits, list) else [habits])
+    return jsonify({'success': True, 'habit': serialize_habit(habit, max(day, datetime.now().date()))})
+
+@advanced_bp.route('/api/habits/<habit_id>/heatmap', methods=['GET'])
+@login_required
+def habit_heatmap(habit_id):
+    """Get a habit's completions for every day of a year, for calendar heatmaps"""
+    user_id = session.get('user_id')
+    today = datetime.now().date()
+    year = request.args.get('year', today.year, type=int)
+    
+    habit = store.get('habits', habit_id)
+    if habit is None or habit.get('userId') != user_id:
+        return jsonify({'success': False, 'message': 'Habit not found'}), 404
+    
+    history = habit_history(habit)
+    return jsonify({
+        'success': True,
+        'habitId': habit_id,
+        'year': year,
+        'days': streaks.heatmap(history, year),
+        **streaks.summarize(history, today)
+    })
 
 # Achievement endpoints
 @advanced_bp.route('/api/gamification/achievements', methods=['GET'])
 @login_required
 def get_achievements():
     """Get achievements for gamification"""
-    return jsonify(MOCK_DATA['achievements'])
+    return jsonify(store.get('achievements'))
 
 @advanced_bp.route('/api/gamification/achievements', methods=['POST'])
 @login_required
 def complete_achievements():
-    """Mark achievements as completed"""
+    """Mark achievements as completed
+    
+    Only achievements the engine doesn't evaluate can be reported by the
+    client, the others are unlocked from the user's events.
+    """
     user_id = session.get('user_id')
-    user_data = get_user_data(user_id)
     
     data = request.json
-    achievements = data.get('achievements', [])
+    achievements = [a for a in data.get('achievements', []) if not is_server_evaluated(a)]
     
-    for achievement_id in achievements:
-        if achievement_id not in user_data['achievements']:
-            user_data['achievements'].append(achievement_id)
+    def complete(user_data):
+        for achievement_id in achievements:
+            if achievement_id not in user_data['achievements']:
+                user_data['achievements'].append(achievement_id)
     
-    save_mock_data()
+    user_data = update_user_data(user_id, complete)
     return jsonify({'success': True, 'achievements': user_data['achievements']})
 
 # Challenge endpoints
@@ -356,14 +400,13 @@ def complete_achievements():
 @login_required
 def get_challenges():
     """Get challenges for gamification"""
-    return jsonify(MOCK_DATA['challenges'])
+    return jsonify(store.get('challenges'))
 
 @advanced_bp.route('/api/gamification/challenges', methods=['POST'])
 @login_required
 def complete_challenge():
     """Complete a challenge"""
     user_id = session.get('user_id')
-    user_data = get_user_data(user_id)
     
     data = request.json
     challenge_id = data.get('challengeId')
@@ -372,15 +415,17 @@ def complete_challenge():
         return jsonify({'success': False, 'message': 'Challenge ID is required'}), 400
     
     # Find the challenge
-    challenge = next((c for c in MOCK_DATA['challenges'] if c['id'] == challenge_id), None)
+    challenge = next((c for c in store.get('challenges') if c['id'] == challenge_id), None)
     if not challenge:
         return jsonify({'success': False, 'message': 'Challenge not found'}), 404
     
     # Mark as completed
-    if challenge_id not in user_data['completedChallenges']:
+    def complete(user_data):
+        if challenge_id in user_data['completedChallenges']:
+            return False
         user_data['completedChallenges'].append(challenge_id)
     
-    save_mock_data()
+    user_data = update_user_data(user_id, complete)
     return jsonify({
         'success': True, 
         'challenge': challenge,
@@ -392,14 +437,13 @@ def complete_challenge():
 @login_required
 def get_rewards():
     """Get rewards for gamification"""
-    return jsonify(MOCK_DATA['rewards'])
+    return jsonify(store.get('rewards'))
 
 @advanced_bp.route('/api/gamification/rewards', methods=['POST'])
 @login_required
 def unlock_reward():
     """Unlock a reward"""
     user_id = session.get('user_id')
-    user_data = get_user_data(user_id)
     
     data = request.json
     reward_id = data.get('rewardId')
@@ -409,26 +453,34 @@ def unlock_reward():
         return jsonify({'success': False, 'message': 'Reward ID is required'}), 400
     
     # Find the reward
-    reward = next((r for r in MOCK_DATA['rewards'] if r['id'] == reward_id), None)
+    reward = next((r for r in store.get('rewards') if r['id'] == reward_id), None)
     if not reward:
         return jsonify({'success': False, 'message': 'Reward not found'}), 404
     
-    # Check if already unlocked
-    if reward_id in user_data['unlockedRewards']:
-        return jsonify({'success': False, 'message': 'Reward already unlocked'}), 400
-    
-    # Check if user has enough XP
-    if not from_level_up and reward.get('cost', 0) > user_data['xp']:
-        return jsonify({'success': False, 'message': 'Not enough XP'}), 400
-    
-    # Deduct XP if not from level up
-    if not from_level_up and reward.get('cost', 0) > 0:
-        user_data['xp'] -= reward['cost']
+    # The checks run on the latest data, so two requests can't both spend the same XP
+    errors = []
+    def unlock(user_data):
+        # Check if already unlocked
+        if reward_id in user_data['unlockedRewards']:
+            errors.append('Reward already unlocked')
+            return False
+        
+        # Check if user has enough XP
+        if not from_level_up and reward.get('cost', 0) > user_data['xp']:
+            errors.append('Not enough XP')
+            return False
+        
+        # Deduct XP if not from level up
+        if not from_level_up and reward.get('cost', 0) > 0:
+            user_data['xp'] -= reward['cost']
+        
+        # Unlock reward
+        user_data['unlockedRewards'].append(reward_id)
     
-    # Unlock reward
-    user_data['unlockedRewards'].append(reward_id)
+    user_data = update_user_data(user_id, unlock)
+    if errors:
+        return jsonify({'success': False, 'message': errors[0]}), 400
     
-    save_mock_data()
     return jsonify({
         'success': True, 
         'reward': reward,
@@ -442,7 +494,6 @@ def unlock_reward():
 def award_xp():
     """Award XP to user"""
     user_id = session.get('user_id')
-    user_data = get_user_data(user_id)
     
     data = request.json
     amount = data.get('amount', 0)
@@ -451,21 +502,28 @@ def award_xp():
     if amount <= 0:
         return jsonify({'success': False, 'message': 'XP amount must be positive'}), 400
     
-    # Award XP
-    user_data['xp'] += amount
-    user_data['totalXp'] += amount
-    
-    # Check for level up
-    level_up = False
-    old_level = user_data['level']
+    levels = {}
+    unlocked = []
+    def award(user_data):
+        # Award XP
+        user_data['xp'] += amount
+        user_data['totalXp'] += amount
+        
+        # Check for level up
+        levels['old'] = user_data['level']
+        
+        # Simple level formula: level = 1 + floor(totalXp / 100)
+        new_level = 1 + user_data['totalXp'] // 100
+        if new_level > levels['old']:
+            user_data['level'] = new_level
+        
+        # Level achievements, whose XP rewards can raise the level further
+        unlocked.extend(apply_event(user_data, 'xp_awarded', {}))
     
-    # Simple level formula: level = 1 + floor(totalXp / 100)
-    new_level = 1 + user_data['totalXp'] // 100
-    if new_level > old_level:
-        user_data['level'] = new_level
-        level_up = True
+    user_data = update_user_data(user_id, award)
+    old_level = levels['old']
+    level_up = user_data['level'] > old_level
     
-    save_mock_data()
     return jsonify({
         'success': True,
         'xp': user_data['xp'],
@@ -473,34 +531,43 @@ def award_xp():
         'level': user_data['level'],
         'levelUp': level_up,
         'oldLevel': old_level,
-        'newLevel': user_data['level']
+        'newLevel': user_data['level'],
+        'unlockedAchievements': [a['id'] for a in unlocked]
     })
 
 # Streak endpoints
 @advanced_bp.route('/api/gamification/streaks', methods=['POST'])
 @login_required
 def update_streak():
-    """Update activity streak"""
+    """Record an activity for a day and update its streak
+    
+    The streak is computed from the recorded days, a streak sent by the
+    client is ignored.
+    """
     user_id = session.get('user_id')
-    user_data = get_user_data(user_id)
     
     data = request.json
     activity = data.get('activity')
-    streak = data.get('streak', 0)
-    date = data.get('date', datetime.now().strftime('%Y-%m-%d'))
+    day = parse_day(data.get('date'))
     
     if not activity:
         return jsonify({'success': False, 'message': 'Activity is required'}), 400
     
+    if day is None:
+        return jsonify({'success': False, 'message': 'Date must be YYYY-MM-DD'}), 400
+    
     # Update streak
-    user_data['streaks'][activity] = streak
+    def record(user_data):
+        history = user_data.setdefault('activityHistory', {}).setdefault(activity, {})
+        streaks.set_day(history, day)
+        user_data['streaks'][activity] = streaks.current_streak(history, max(day, datetime.now().date()))
     
-    save_mock_data()
+    user_data = update_user_data(user_id, record)
     return jsonify({
         'success': True,
         'activity': activity,
-        'streak': streak,
-        'date': date,
+        'streak': user_data['streaks'][activity],
+        'date': day.isoformat(),
         'streaks': user_data['streaks']
     })
 
@@ -508,41 +575,27 @@ def update_streak():
 @advanced_bp.route('/api/ai-advisor', methods=['GET'])
 @login_required
 def get_ai_advice():
-    """Get AI advice"""
+    """Get personalized plant advice
+    
+    The advice is ranked by plant_advisor from the user's plants and recent
+    conditions, and served from its cache.
+    """
+    user_id = session.get('user_id')
     topic = request.args.get('topic', 'general')
+    if topic not in GENERAL_TIPS:
+        topic = 'general'
     
-    # Sample advice by topic
-    advice = {
-        'watering': [
-            "Remember that consistent watering is key to healthy plants. Try to water at the same time each day.",
-            "When watering, aim for the soil rather than the leaves to prevent fungal issues.",
-            "Most plants prefer deep, infrequent watering rather than frequent light watering."
-        ],
-        'sunlight': [
-            "Rotate your plants occasionally so all sides get equal sunlight exposure.",
-            "If your plant's leaves are yellowing, it might be getting too much direct sunlight.",
-            "For plants that need indirect light, place them near a north or east-facing window."
-        ],
-        'motivation': [
-            "Building habits takes time. Focus on consistency rather than perfection.",
-            "Try linking your new habit to an existing routine to make it easier to remember.",
-            "Celebrate small wins! Each day you complete your habit is a success."
-        ],
-        'general': [
-            "Taking care of plants can improve your mood and reduce stress levels.",
-            "Consider keeping a plant journal to track growth and changes over time.",
-            "Talking to your plants might sound silly, but the extra CO2 can actually help them grow!"
-        ]
-    }
+    # Every topic's advice counts as general advice
+    suggestions = [s for s in get_advice(user_id) if topic == 'general' or s['topic'] == topic]
     
-    # Get random advice for the topic
-    topic_advice = advice.get(topic, advice['general'])
-    selected_advice = random.choice(topic_advice)
+    # Fall back to a general tip about the topic when there's nothing personal to say
+    selected_advice = suggestions[0]['advice'] if suggestions else random.choice(GENERAL_TIPS[topic])
     
     return jsonify({
         'success': True,
         'topic': topic,
-        'advice': f"🌱 {selected_advice}"
+        'advice': f"🌱 {selected_advice}",
+        'suggestions': suggestions
     })
 
 # Water credits endpoint
@@ -551,19 +604,19 @@ def get_ai_advice():
 def add_water_credits():
     """Add water credits"""
     user_id = session.get('user_id')
-    user_data = get_user_data(user_id)
     
     data = request.json
     amount = data.get('amount', 1)
     
-    # Initialize water credits if not present
-    if 'water_credits' not in user_data:
-        user_data['water_credits'] = 0
-    
-    # Add credits
-    user_data['water_credits'] += amount
+    def add_credits(user_data):
+        # Initialize water credits if not present
+        if 'water_credits' not in user_data:
+            user_data['water_credits'] = 0
+        
+        # Add credits
+        user_data['water_credits'] += amount
     
-    save_mock_data()
+    user_data = update_user_data(user_id, add_credits)
     return jsonify({
         'success': True,
         'message': f"Added {amount} water credits",
@@ -6,6 +6,7 @@ import re
 import time
 from models import User
 from app import db
+from rate_limit import rate_limit
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -69,6 +70,7 @@ def validate_username(username):
     return True, "Username is valid"
 
 @auth_bp.route('/api/auth/register', methods=['POST'])
+@rate_limit(5, 3600, scope='ip')
 def register():
     """Register a new user with enhanced validation"""
     data = request.json
@@ -137,6 +139,7 @@ def register():
         }), 400
 
 @auth_bp.route('/api/auth/login', methods=['POST'])
+@rate_limit(10, 60, scope='ip')
 def login():
     """Log in a user with enhanced security"""
     data = request.json
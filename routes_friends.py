@@ -4,6 +4,8 @@ from app import app, db
 from models import User, Friendship, FriendshipStatus, Plant
 import logging
 from sqlalchemy import or_, and_
+from serializers import PLANT_FIELDS, FRIEND_FIELDS, parse_fields, select_columns, serialize_rows
+from db_routing import use_replica
 
 # Friends page route
 @app.route('/friends')
@@ -144,6 +146,12 @@ def remove_friend(user_id):
     db.session.delete(friendship)
     db.session.commit()
     
+    # Friend achievements follow the current number of friends
+    current_user.record_friends_changed()
+    friend = db.session.get(User, user_id)
+    if friend:
+        friend.record_friends_changed()
+    
     return jsonify({
         'success': True,
         'message': 'Friend removed successfully'
@@ -152,23 +160,23 @@ def remove_friend(user_id):
 # API route to get all friends
 @app.route('/api/friends', methods=['GET'])
 @login_required
+@use_replica
 def get_friends():
     """API endpoint to get all friends"""
-    friends = current_user.get_friends()
+    try:
+        fields = parse_fields(FRIEND_FIELDS)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    friend_ids = current_user.get_friend_ids()
     
     friend_list = []
-    for friend in friends:
-        # Count plants
-        plants_count = Plant.query.filter_by(user_id=friend.id).count()
-        
-        friend_list.append({
-            'id': friend.id,
-            'username': friend.username,
-            'water_credits': friend.water_credits,
-            'garden_score': friend.garden_score,
-            'plants_count': plants_count,
-            'created_at': friend.created_at.isoformat()
-        })
+    if friend_ids:
+        # Load only the requested columns of all friends in a single query
+        friends = db.session.query(*select_columns(FRIEND_FIELDS, fields)).filter(
+            User.id.in_(friend_ids)
+        ).all()
+        friend_list = serialize_rows(friends, fields)
     
     return jsonify({
         'success': True,
@@ -225,6 +233,7 @@ def get_pending_requests():
 # API route to get friend's garden data
 @app.route('/api/friends/<user_id>/garden', methods=['GET'])
 @login_required
+@use_replica
 def get_friend_garden(user_id):
     """API endpoint to get a friend's garden data"""
     friend = User.query.get(user_id)
@@ -233,28 +242,21 @@ def get_friend_garden(user_id):
         return jsonify({'success': False, 'message': 'User not found'})
     
     # Verify that the user is actually a friend
-    friends = current_user.get_friends()
-    friend_ids = [f.id for f in friends]
-    
-    if friend.id not in friend_ids:
+    if friend.id not in current_user.get_friend_ids():
         return jsonify({'success': False, 'message': 'You are not friends with this user'})
     
-    # Get friend's plants
-    plants = []
-    for plant in friend.plants:
-        plants.append({
-            'id': plant.id,
-            'name': plant.name,
-            'type': plant.plant_type,
-            'stage': plant.stage,
-            'health': plant.health,
-            'progress': plant.progress,
-            'created_at': plant.created_at.isoformat(),
-            'last_watered': plant.last_watered.isoformat()
-        })
+    try:
+        fields = parse_fields(PLANT_FIELDS)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    # Get the requested columns of the friend's plants
+    plants = db.session.query(*select_columns(PLANT_FIELDS, fields)).filter(
+        Plant.user_id == friend.id
+    ).all()
     
     return jsonify({
         'success': True,
         'username': friend.username,
-        'plants': plants
-    })
\ No newline at end of file
+        'plants': serialize_rows(plants, fields)
+    })
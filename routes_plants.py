@@ -8,7 +8,12 @@ from datetime import datetime, timedelta
 import random
 from functools import wraps
 from app import db
-from models import Plant, PlantType, User
+from models import Plant, PlantType, PlantStage, User
+from serializers import PLANT_FIELDS, parse_fields, select_columns, serialize_rows
+from garden_events import publish_plant, publish_plant_deleted, publish_credits
+from db_routing import use_replica
+from achievements import record_event
+from plant_advisor import bump_garden_version, refresh_advice
 
 # Create blueprint
 plants_bp = Blueprint('plants', __name__)
@@ -101,25 +106,30 @@ def initialize_plant_types():
         db.session.rollback()
         logging.error(f"Error initializing plant types: {str(e)}")
 
-# Initialize data when module is loaded
-try:
-    initialize_plant_types()
-except Exception as e:
-    logging.error(f"Error during initialization: {str(e)}")
-
 # Get all plants for a user
 @plants_bp.route('/api/plants', methods=['GET'])
 @api_login_required
+@use_replica
 def get_plants():
     """Get all plants for the current user"""
     user_id = session.get('user_id')
     
     try:
-        # Get all plants for the current user
-        plants = Plant.query.filter_by(user_id=user_id).all()
+        fields = parse_fields(PLANT_FIELDS)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    try:
+        # Get the requested columns of all plants for the current user
+        plants = db.session.query(*select_columns(PLANT_FIELDS, fields)).filter(
+            Plant.user_id == user_id
+        ).all()
         
         # Convert to dictionary format
-        plants_data = [plant.to_dict() for plant in plants]
+        plants_data = serialize_rows(plants, fields)
         
         return jsonify(plants_data)
     except Exception as e:
@@ -169,7 +179,10 @@ def add_plant():
         
         # Add to database
         db.session.add(new_plant)
+        bump_garden_version(user_id)
         db.session.commit()
+        publish_plant(new_plant)
+        refresh_advice(user_id)
         
         # Get the user and increase their garden score
         from models import User
@@ -262,7 +275,10 @@ def update_plant(plant_id):
             plant.stage = max(0, min(6, data['stage']))
         
         # Save changes
+        bump_garden_version(user_id)
         db.session.commit()
+        publish_plant(plant)
+        refresh_advice(user_id)
         
         return jsonify({
             'success': True,
@@ -317,9 +333,11 @@ def water_plant(plant_id):
         plant.progress = min(100, plant.progress + 5)
         
         # Check if plant should advance to next stage
+        stage_advanced = False
         if plant.progress >= 100 and plant.stage < 6:
             plant.stage += 1
             plant.progress = 0
+            stage_advanced = True
             
             # Award points for advancing a stage
             if user:
@@ -336,7 +354,17 @@ def water_plant(plant_id):
                 logging.error(f"Error updating water credits: {str(credit_error)}")
         
         # Save changes
+        bump_garden_version(user_id)
         db.session.commit()
+        publish_plant(plant)
+        refresh_advice(user_id)
+        if user:
+            publish_credits(user)
+            record_event(user_id, 'plant_watered', {
+                'stage_advanced': stage_advanced,
+                'max_growth': stage_advanced and plant.stage == PlantStage.FLOWERING.value,
+                'garden_score': user.garden_score
+            })
         
         return jsonify({
             'success': True,
@@ -378,7 +406,10 @@ def delete_plant(plant_id):
         
         # Delete the plant
         db.session.delete(plant)
+        bump_garden_version(user_id)
         db.session.commit()
+        publish_plant_deleted(user_id, plant_id)
+        refresh_advice(user_id)
         
         return jsonify({
             'success': True,
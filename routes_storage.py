@@ -1,11 +1,15 @@
 from flask import Blueprint, request, jsonify, session, g
 from supabase_storage import SupabaseStorage
+from supabase_lazy import get_supabase_client
 import logging
 import base64
+from rate_limit import rate_limit
 
 storage_bp = Blueprint('storage', __name__)
 
 @storage_bp.route('/api/storage/upload', methods=['POST'])
+@rate_limit(30, 60, scope='ip', name='storage_ip')
+@rate_limit(10, 60, scope='user', name='storage_user')
 def upload_file():
     """Upload a file to Supabase Storage"""
     if 'user_id' not in session:
@@ -27,7 +31,7 @@ def upload_file():
         }), 400
     
     # Log upload attempt
-    logging.info(f"Attempting to upload file to bucket: {bucket_name}")
+    logging.debug("Attempting to upload file to bucket: %s", bucket_name)
     
     try:
         # Decode base64 file data
@@ -68,6 +72,8 @@ def upload_file():
         }), 400
 
 @storage_bp.route('/api/storage/profile-picture', methods=['POST'])
+@rate_limit(30, 60, scope='ip', name='storage_ip')
+@rate_limit(10, 60, scope='user', name='storage_user')
 def upload_profile_picture():
     """Upload a profile picture"""
     if 'user_id' not in session:
@@ -87,7 +93,7 @@ def upload_profile_picture():
         }), 400
     
     # Log upload attempt
-    logging.info(f"Attempting to upload profile picture for user: {session['user_id']}")
+    logging.debug("Attempting to upload profile picture for user: %s", session['user_id'])
     
     try:
         # Decode base64 file data
@@ -158,6 +164,8 @@ def upload_profile_picture():
         }), 400
 
 @storage_bp.route('/api/storage/plant-image/<int:plant_id>', methods=['POST'])
+@rate_limit(30, 60, scope='ip', name='storage_ip')
+@rate_limit(10, 60, scope='user', name='storage_user')
 def upload_plant_image(plant_id):
     """Upload an image for a plant"""
     if 'user_id' not in session:
@@ -177,7 +185,7 @@ def upload_plant_image(plant_id):
         }), 400
     
     # Log upload attempt
-    logging.info(f"Attempting to upload plant image for plant ID: {plant_id}, user: {session['user_id']}")
+    logging.debug("Attempting to upload plant image for plant ID: %s, user: %s", plant_id, session['user_id'])
     
     try:
         # Decode base64 file data
@@ -204,10 +212,8 @@ def upload_plant_image(plant_id):
         if result['success']:
             # Try to update plant with image URL in Supabase
             try:
-                from supabase import create_client
-                import os
-                
-                supabase = create_client(os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_KEY"))
+                # Shared client, reusing the worker's pooled connections
+                supabase = get_supabase_client()
                 
                 # Update plant in Supabase
                 update_result = supabase.table('plants').update({
@@ -264,7 +270,7 @@ def delete_file():
         }), 400
     
     # Log deletion attempt
-    logging.info(f"Attempting to delete file: {file_path} from bucket: {bucket_name}")
+    logging.debug("Attempting to delete file: %s from bucket: %s", file_path, bucket_name)
     
     # Ensure the file path includes the user ID to prevent unauthorized deletion
     # Skip this check for admin users if needed
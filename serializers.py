@@ -0,0 +1,93 @@
+from flask import request
+from sqlalchemy import func, select
+from models import Plant, Condition, User
+
+# Columns that can be requested through the ?fields= query parameter.
+# Keys are the names used in the JSON responses, values are the SQL columns.
+PLANT_FIELDS = {
+    'id': Plant.id,
+    'name': Plant.name,
+    'type': Plant.plant_type,
+    'stage': Plant.stage,
+    'health': Plant.health,
+    'progress': Plant.progress,
+    'created_at': Plant.created_at,
+    'last_watered': Plant.last_watered
+}
+
+CONDITION_FIELDS = {
+    'id': Condition.id,
+    'type_name': Condition.type_name,
+    'value': Condition.value,
+    'date_logged': Condition.date_logged
+}
+
+FRIEND_FIELDS = {
+    'id': User.id,
+    'username': User.username,
+    'water_credits': User.water_credits,
+    'garden_score': User.garden_score,
+    # Correlated subquery so the count is only computed when it is requested
+    'plants_count': select(func.count(Plant.id)).where(Plant.user_id == User.id).scalar_subquery(),
+    'created_at': User.created_at
+}
+
+# Fields that are returned as ISO formatted strings
+DATETIME_FIELDS = {'created_at', 'last_watered', 'date_logged'}
+
+def format_datetime(value):
+    """Format a datetime value the same way the API has always done"""
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+def parse_fields(available):
+    """Get the list of fields requested with ?fields=
+
+    Args:
+        available: Mapping of field names that the endpoint can return
+
+    Returns:
+        List of field names, all of them if the parameter was not given
+
+    Raises:
+        ValueError: If an unknown field was requested
+    """
+    raw_fields = request.args.get('fields')
+    if not raw_fields:
+        return list(available)
+
+    # Keep the requested order but drop duplicates and empty entries
+    fields = list(dict.fromkeys(name.strip() for name in raw_fields.split(',') if name.strip()))
+
+    unknown = [name for name in fields if name not in available]
+    if unknown or not fields:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown) or raw_fields}")
+
+    return fields
+
+def select_columns(available, fields):
+    """Build the labelled SQL columns for the requested fields"""
+    return [available[name].label(name) for name in fields]
+
+def serialize_row(row, fields):
+    """Serialize a result row containing only the requested fields"""
+    data = {}
+    for name in fields:
+        value = getattr(row, name)
+        if name in DATETIME_FIELDS and value is not None:
+            value = format_datetime(value)
+        data[name] = value
+    return data
+
+def serialize_rows(rows, fields):
+    """Serialize a list of result rows"""
+    return [serialize_row(row, fields) for row in rows]
+
+def serialize_model(obj, available):
+    """Serialize a loaded model instance with every field of the mapping"""
+    data = {}
+    for name, column in available.items():
+        value = getattr(obj, column.key)
+        if name in DATETIME_FIELDS and value is not None:
+            value = format_datetime(value)
+        data[name] = value
+    return data
@@ -37,9 +37,11 @@ def create_tables():
             email VARCHAR(255) NOT NULL UNIQUE,
             username VARCHAR(100) NOT NULL,
             water_credits INTEGER NOT NULL DEFAULT 20,
+            garden_version INTEGER NOT NULL DEFAULT 0,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         """)
+        cursor.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS garden_version INTEGER NOT NULL DEFAULT 0")
         logging.info("Users table created or already exists")
         
         # Plants table
@@ -88,6 +90,7 @@ def create_tables():
         cursor.execute("""
         CREATE INDEX IF NOT EXISTS idx_plants_user_id ON plants(user_id);
         CREATE INDEX IF NOT EXISTS idx_conditions_user_id ON conditions(user_id);
+        CREATE INDEX IF NOT EXISTS idx_conditions_user_type_date ON conditions(user_id, type_name, date_logged);
         CREATE INDEX IF NOT EXISTS idx_condition_types_user_id ON condition_types(user_id);
         """)
         logging.info("Indexes created or already exist")
@@ -25,8 +25,8 @@ if not SUPABASE_URL or not SUPABASE_KEY:
     sys.exit(1)
 
 try:
-    from supabase import create_client
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    from supabase_lazy import get_supabase_client
+    supabase = get_supabase_client(SUPABASE_URL, SUPABASE_KEY).get_client()
 except ImportError:
     logging.error("Supabase Python client not installed")
     logging.error("Please install it with: pip install supabase")
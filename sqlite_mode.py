@@ -0,0 +1,90 @@
+import logging
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Bind key of the read-only connection pool (see db_routing.RoutingSession)
+READ_BIND_KEY = 'read'
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),        # Readers don't block the writer and vice versa
+    ('synchronous', 'NORMAL'),      # Safe with WAL, fsyncs only at checkpoints
+    ('busy_timeout', 5000),         # Wait up to 5s for another worker's write lock
+    ('mmap_size', 268435456),       # Read through a 256MB memory map
+    ('cache_size', -64000),         # 64MB page cache per connection
+    ('foreign_keys', 'ON'),
+    ('temp_store', 'MEMORY'),
+)
+
+def is_sqlite_file_url(url):
+    """Check if a database URL points at an SQLite database file"""
+    if not url:
+        return False
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+def set_sqlite_pragmas(dbapi_connection, read_only=False):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            # The read pool must never write, even by accident
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+def setup_sqlite_engine(engine, read_only=False):
+    """Apply the pragmas to every connection of an SQLite engine
+
+    Write connections start their transactions with BEGIN IMMEDIATE, so the
+    write lock is taken up front and waits on busy_timeout instead of failing
+    with "database is locked" when a read transaction is upgraded.
+    """
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        set_sqlite_pragmas(dbapi_connection, read_only)
+        if not read_only:
+            # Let SQLAlchemy, not the sqlite3 module, emit BEGIN
+            dbapi_connection.isolation_level = None
+
+    if not read_only:
+        @event.listens_for(engine, 'begin')
+        def on_begin(conn):
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+
+def configure_sqlite(app, database_url):
+    """Configure separate write and read pools for an SQLite database file
+
+    Must be called before db.init_app(). The write pool has a single
+    connection per worker (SQLite allows one writer at a time anyway) and
+    the read pool SQLITE_READ_POOL_SIZE connections. Sessions choose
+    between them in db_routing.RoutingSession.
+    """
+    write_pool_size = int(os.environ.get('SQLITE_WRITE_POOL_SIZE', 1))
+    read_pool_size = int(os.environ.get('SQLITE_READ_POOL_SIZE', 5))
+
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': write_pool_size,
+        'max_overflow': 0,
+        'pool_timeout': 30,
+    }
+    binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+    binds[READ_BIND_KEY] = {
+        'url': database_url,
+        'pool_size': read_pool_size,
+        'max_overflow': read_pool_size,
+    }
+    app.config['SQLITE_MODE'] = True
+
+def init_sqlite_engines(app, db):
+    """Apply the pragmas to the write and read engines created by db.init_app()"""
+    if not app.config.get('SQLITE_MODE'):
+        return
+
+    with app.app_context():
+        setup_sqlite_engine(db.engines[None])
+        setup_sqlite_engine(db.engines[READ_BIND_KEY], read_only=True)
+
+    logging.info("SQLite mode enabled: WAL journal with separate read and write pools")
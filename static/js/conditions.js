@@ -33,6 +33,14 @@ document.addEventListener('DOMContentLoaded', function() {
     
     async function fetchConditionTypes() {
         try {
+            // Reuse the garden bootstrap response if the garden page already requested it
+            const bootstrap = window.gardenBootstrap ? await window.gardenBootstrap : null;
+            if (bootstrap && bootstrap.success) {
+                conditionTypes = bootstrap.condition_types;
+                populateConditionTypeSelect();
+                return;
+            }
+            
             const response = await fetch('/api/condition-types');
             const data = await response.json();
             
@@ -405,7 +413,11 @@ document.addEventListener('DOMContentLoaded', function() {
             
             const data = await response.json();
             
-            if (data.success) {
+            if (data.pending) {
+                // Still being saved, clear the form so it isn't logged twice
+                valueInput.value = '';
+                showNotification(data.message, 'info');
+            } else if (data.success) {
                 // Reset form
                 valueInput.value = '';
                 
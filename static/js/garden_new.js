@@ -608,7 +608,10 @@ document.addEventListener('DOMContentLoaded', function() {
             
             const data = await response.json();
             
-            if (data.success) {
+            if (data.pending) {
+                // Still being saved, the garden stream delivers the result
+                showNotification(data.message, 'info');
+            } else if (data.success) {
                 // Update water credits
                 waterCredits = data.water_credits;
                 updateWaterCreditsDisplay();
@@ -666,6 +669,11 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Initialize garden with improved error handling
     async function initGarden() {
+        // Start the bootstrap request right away so other scripts can share it
+        window.gardenBootstrap = fetch('/api/garden/bootstrap')
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+        
         try {
             // Show loading indicator
             if (window.showNotification) {
@@ -682,39 +690,44 @@ document.addEventListener('DOMContentLoaded', function() {
                 document.body.appendChild(container);
             }
             
-            // Load plant types for the add plant form first (faster response)
-            try {
-                await loadPlantTypes();
-                console.log('Plant types loaded successfully');
-            } catch (typeError) {
-                console.error('Error loading plant types:', typeError);
-                if (window.showNotification) {
-                    window.showNotification('Error loading plant types. Please try again.', 'warning');
+            // Load everything from the bootstrap endpoint in a single request
+            if (await loadGardenBootstrap()) {
+                console.log('Garden bootstrap loaded successfully');
+            } else {
+                // Load plant types for the add plant form first (faster response)
+                try {
+                    await loadPlantTypes();
+                    console.log('Plant types loaded successfully');
+                } catch (typeError) {
+                    console.error('Error loading plant types:', typeError);
+                    if (window.showNotification) {
+                        window.showNotification('Error loading plant types. Please try again.', 'warning');
+                    }
                 }
-            }
-            
-            // Fetch water credits
-            try {
-                await fetchWaterCredits();
-                console.log('Water credits loaded successfully');
-            } catch (waterError) {
-                console.error('Error loading water credits:', waterError);
-                // Use default water credits
-                waterCredits = 20;
-                updateWaterCreditsDisplay();
-            }
-            
-            // Fetch and display plants
-            try {
-                await fetchPlants();
-                console.log('Plants loaded successfully');
-            } catch (plantsError) {
-                console.error('Error loading plants:', plantsError);
-                if (window.showNotification) {
-                    window.showNotification('Error loading plants. Please try again.', 'warning');
+                
+                // Fetch water credits
+                try {
+                    await fetchWaterCredits();
+                    console.log('Water credits loaded successfully');
+                } catch (waterError) {
+                    console.error('Error loading water credits:', waterError);
+                    // Use default water credits
+                    waterCredits = 20;
+                    updateWaterCreditsDisplay();
+                }
+                
+                // Fetch and display plants
+                try {
+                    await fetchPlants();
+                    console.log('Plants loaded successfully');
+                } catch (plantsError) {
+                    console.error('Error loading plants:', plantsError);
+                    if (window.showNotification) {
+                        window.showNotification('Error loading plants. Please try again.', 'warning');
+                    }
+                    // Show empty garden
+                    renderGarden();
                 }
-                // Show empty garden
-                renderGarden();
             }
             
             // Initialize plant details panel
@@ -728,6 +741,9 @@ document.addEventListener('DOMContentLoaded', function() {
                 createPlantDetailsModal();
             }
             
+            // Receive live updates instead of polling
+            subscribeToGardenStream();
+            
             console.log('Garden initialized successfully');
         } catch (error) {
             console.error('Error initializing garden:', error);
@@ -1021,6 +1037,68 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
+    // Load water credits, plant types and plants from the bootstrap response
+    async function loadGardenBootstrap() {
+        const data = await window.gardenBootstrap;
+        
+        if (!data || !data.success) {
+            return false;
+        }
+        
+        waterCredits = data.water_credits;
+        updateWaterCreditsDisplay();
+        
+        const typeSelect = document.getElementById('plant-type');
+        if (typeSelect) {
+            // Clear existing options except the first one
+            while (typeSelect.options.length > 1) {
+                typeSelect.remove(1);
+            }
+            
+            data.plant_types.forEach(type => {
+                const option = document.createElement('option');
+                option.value = type.value;
+                option.text = type.name.charAt(0) + type.name.slice(1).toLowerCase();
+                typeSelect.add(option);
+            });
+        }
+        
+        plants = data.plants;
+        renderGarden();
+        
+        return true;
+    }
+    
+    // Apply plant, credit and score changes pushed by the server
+    function subscribeToGardenStream() {
+        if (!window.EventSource || window.gardenStream) return;
+        
+        window.gardenStream = new EventSource('/api/garden/stream');
+        
+        window.gardenStream.addEventListener('plant', event => {
+            const plant = JSON.parse(event.data);
+            const index = plants.findIndex(p => p.id === plant.id);
+            
+            if (index === -1) {
+                plants.push(plant);
+            } else {
+                plants[index] = Object.assign({}, plants[index], plant);
+            }
+            renderGarden();
+        });
+        
+        window.gardenStream.addEventListener('plant_deleted', event => {
+            const data = JSON.parse(event.data);
+            plants = plants.filter(p => p.id !== data.id);
+            renderGarden();
+        });
+        
+        window.gardenStream.addEventListener('credits', event => {
+            waterCredits = JSON.parse(event.data).water_credits;
+            updateWaterCreditsDisplay();
+        });
+    }
+    
     // Update water credits display
     function updateWaterCreditsDisplay() {
         if (waterCreditsCount) {
@@ -0,0 +1,126 @@
+import base64
+import calendar
+from datetime import date, timedelta
+
+# Bytes in a year bitmap, one bit per day of the year (366 bits)
+YEAR_BYTES = 46
+
+# Days of completion dates included when a habit is sent to the client
+RECENT_DAYS = 90
+
+# Days the completion rate is computed over
+COMPLETION_RATE_DAYS = 30
+
+# Completion history is a dict of year -> bitmap of the days of that year
+# (bit 0 is January 1st), each a bytearray stored as base64 in JSON, so a
+# habit costs 46 bytes per year however often it is completed.
+
+def days_in_year(year):
+    return 366 if calendar.isleap(year) else 365
+
+def day_index(day):
+    return day.timetuple().tm_yday - 1
+
+def decode_year(encoded):
+    return bytearray(base64.b64decode(encoded)) if encoded else bytearray(YEAR_BYTES)
+
+def encode_year(bits):
+    return base64.b64encode(bytes(bits)).decode('ascii')
+
+def set_day(bitmaps, day, completed=True):
+    """Mark a day as completed (or not) in a completion history"""
+    bits = decode_year(bitmaps.get(str(day.year)))
+    index = day_index(day)
+    if completed:
+        bits[index >> 3] |= 1 << (index & 7)
+    else:
+        bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+    bitmaps[str(day.year)] = encode_year(bits)
+
+def from_dates(dates):
+    """Build a completion history from a list of ISO dates"""
+    bitmaps = {}
+    for day in dates:
+        set_day(bitmaps, date.fromisoformat(day))
+    return bitmaps
+
+def combined_bits(bitmaps, first_year, last_year):
+    """Join the years into one integer, bit 0 being January 1st of first_year"""
+    value = 0
+    offset = 0
+    for year in range(first_year, last_year + 1):
+        encoded = bitmaps.get(str(year))
+        if encoded:
+            value |= int.from_bytes(base64.b64decode(encoded), 'little') << offset
+        offset += days_in_year(year)
+    return value
+
+def first_year(bitmaps):
+    return min(int(year) for year in bitmaps) if bitmaps else None
+
+def current_streak(bitmaps, today):
+    """Consecutive completed days up to today, or up to yesterday if today isn't done yet"""
+    start_year = first_year(bitmaps)
+    if start_year is None or start_year > today.year:
+        return 0
+
+    bits = combined_bits(bitmaps, start_year, today.year)
+    end = (today - date(start_year, 1, 1)).days
+    if not bits >> end & 1:
+        end -= 1
+    if end < 0:
+        return 0
+
+    # The highest missed day up to end is where the streak starts
+    missed = ~bits & ((1 << (end + 1)) - 1)
+    return end - missed.bit_length() + 1
+
+def longest_streak(bitmaps):
+    """Longest run of consecutive completed days"""
+    start_year = first_year(bitmaps)
+    if start_year is None:
+        return 0
+
+    # Each step shortens every run by one day, so the loop runs once per day of the longest run
+    bits = combined_bits(bitmaps, start_year, max(int(year) for year in bitmaps))
+    length = 0
+    while bits:
+        bits &= bits >> 1
+        length += 1
+    return length
+
+def window_bits(bitmaps, start, days):
+    """Bits of the days from start on, bit 0 being start"""
+    end = start + timedelta(days=days - 1)
+    bits = combined_bits(bitmaps, start.year, end.year)
+    return (bits >> day_index(start)) & ((1 << days) - 1)
+
+def completion_rate(bitmaps, today, days=COMPLETION_RATE_DAYS):
+    """Fraction of the last days (up to today) that were completed"""
+    start = today - timedelta(days=days - 1)
+    return round(window_bits(bitmaps, start, days).bit_count() / days, 3)
+
+def completion_dates(bitmaps, today, days=RECENT_DAYS):
+    """ISO dates of the completed days among the last days (up to today)"""
+    start = today - timedelta(days=days - 1)
+    bits = window_bits(bitmaps, start, days)
+    dates = []
+    while bits:
+        # Visit set bits only, lowest first
+        lowest = bits & -bits
+        dates.append((start + timedelta(days=lowest.bit_length() - 1)).isoformat())
+        bits ^= lowest
+    return dates
+
+def heatmap(bitmaps, year):
+    """One 0/1 entry per day of a year"""
+    bits = combined_bits(bitmaps, year, year)
+    return [bits >> index & 1 for index in range(days_in_year(year))]
+
+def summarize(bitmaps, today):
+    """Get the streak statistics of a completion history"""
+    return {
+        'streak': current_streak(bitmaps, today),
+        'longestStreak': longest_streak(bitmaps),
+        'completionRate': completion_rate(bitmaps, today)
+    }
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import os
+import threading
+from supabase_lazy import pool_settings
+
+class AsyncSupabaseGateway:
+    """Makes Supabase REST calls on an asyncio event loop so independent ones overlap
+
+    Each worker runs one event loop on a daemon thread with one pooled
+    httpx.AsyncClient, both created on first use (and again in a worker
+    forked from a process that already used them). Flask views stay
+    synchronous: run() and gather() submit coroutines to the loop and block
+    until they finish, so a flow of independent calls takes as long as the
+    slowest one instead of the sum of all of them.
+
+    The database and storage methods are coroutines taking an optional user
+    access token, sent per request so concurrent calls for different users
+    never share auth state. Without one the API key is used, like a client
+    that isn't signed in. HTTP errors are raised as httpx.HTTPStatusError.
+    """
+
+    def __init__(self, url, key):
+        self._url = url.rstrip('/')
+        self._key = key
+        self._loop = None
+        self._http = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def get_loop(self):
+        if self._loop is None or self._pid != os.getpid():
+            with self._lock:
+                if self._loop is None or self._pid != os.getpid():
+                    import httpx
+
+                    limits, timeout, _ = pool_settings()
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='supabase-async', daemon=True).start()
+                    self._http = httpx.AsyncClient(base_url=self._url, limits=limits, timeout=timeout)
+                    self._loop = loop
+                    self._pid = os.getpid()
+                    logging.debug("Started Supabase event loop")
+        return self._loop
+
+    def run(self, coro):
+        """Run a coroutine on the gateway's event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.get_loop()).result()
+
+    def gather(self, *coros, return_exceptions=False):
+        """Run coroutines concurrently and wait for all of them
+
+        Returns:
+            Their results in order, with exceptions in place of the results
+            of failed ones if return_exceptions is set
+        """
+        async def gather_all():
+            return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+        return self.run(gather_all())
+
+    async def request(self, method, path, token=None, headers=None, **kwargs):
+        """Make a request to the Supabase API and return its decoded JSON body, if any"""
+        request_headers = {'apikey': self._key, 'Authorization': f"Bearer {token or self._key}"}
+        request_headers.update(headers or {})
+        response = await self._http.request(method, path, headers=request_headers, **kwargs)
+        response.raise_for_status()
+        return response.json() if response.content else None
+
+    async def select(self, table, filters, token=None, columns='*'):
+        """Get the rows of a table whose columns equal the values in filters"""
+        params = {column: f"eq.{value}" for column, value in filters.items()}
+        params['select'] = columns
+        return await self.request('GET', f"/rest/v1/{table}", token, params=params)
+
+    async def insert(self, table, rows, token=None):
+        """Insert a row (or a list of rows) and return the inserted rows"""
+        return await self.request(
+            'POST', f"/rest/v1/{table}", token,
+            headers={'Prefer': 'return=representation'}, json=rows
+        )
+
+    async def update(self, table, values, filters, token=None):
+        """Update the rows of a table whose columns equal the values in filters"""
+        params = {column: f"eq.{value}" for column, value in filters.items()}
+        return await self.request('PATCH', f"/rest/v1/{table}", token, params=params, json=values)
+
+    async def list_buckets(self, token=None):
+        return await self.request('GET', "/storage/v1/bucket", token)
+
+    async def create_bucket(self, bucket, public=True, token=None):
+        return await self.request(
+            'POST', "/storage/v1/bucket", token,
+            json={'id': bucket, 'name': bucket, 'public': public}
+        )
+
+    async def list_files(self, bucket, prefix='', token=None):
+        return await self.request(
+            'POST', f"/storage/v1/object/list/{bucket}", token,
+            json={'prefix': prefix, 'limit': 100, 'offset': 0}
+        )
+
+# Shared gateways by (url, key)
+_gateways = {}
+_gateways_lock = threading.Lock()
+
+def get_async_gateway(url=None, key=None):
+    """Get the shared async gateway for a project, or None if Supabase isn't configured
+
+    Like get_supabase_client(), with SUPABASE_URL and SUPABASE_KEY by default.
+    """
+    url = url or os.environ.get('SUPABASE_URL')
+    key = key or os.environ.get('SUPABASE_KEY')
+    if not url or not key:
+        return None
+
+    with _gateways_lock:
+        gateway = _gateways.get((url, key))
+        if gateway is None:
+            gateway = _gateways[(url, key)] = AsyncSupabaseGateway(url, key)
+        return gateway
@@ -3,9 +3,11 @@ import json
 import logging
 import hashlib
 import secrets
-from supabase import create_client, Client
+from functools import lru_cache
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from supabase_lazy import get_supabase_client
+from supabase_async import get_async_gateway
 from flask import request
 
 # Initialize Supabase client
@@ -15,48 +17,53 @@ SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 if not SUPABASE_URL or not SUPABASE_KEY:
     logging.warning("Supabase credentials not found in environment variables")
 
-# Enhanced password hashing with Argon2 if available, otherwise use bcrypt
-try:
-    from argon2 import PasswordHasher
-    ph = PasswordHasher(
+# Enhanced password hashing with Argon2 if available, otherwise use pbkdf2:sha256.
+# argon2 is imported on the first hash or verify, not when this module loads.
+@lru_cache(maxsize=None)
+def get_password_hasher():
+    """Get the Argon2 password hasher, or None if argon2 isn't installed"""
+    try:
+        from argon2 import PasswordHasher
+    except ImportError:
+        logging.info("Using pbkdf2:sha256 for password hashing (Argon2 not available)")
+        return None
+    
+    logging.info("Using Argon2 for password hashing")
+    return PasswordHasher(
         time_cost=3,       # Number of iterations
         memory_cost=65536, # Memory usage in kibibytes
         parallelism=4,     # Number of parallel threads
         hash_len=32,       # Length of the hash in bytes
         salt_len=16        # Length of the salt in bytes
     )
-    
-    def hash_password(password):
-        """Hash a password using Argon2"""
+
+def hash_password(password):
+    """Hash a password using Argon2, or pbkdf2:sha256 as a fallback"""
+    ph = get_password_hasher()
+    if ph:
         return ph.hash(password)
-    
-    def verify_password(hashed_password, password):
-        """Verify a password against a hash using Argon2"""
+    return generate_password_hash(password, method='pbkdf2:sha256:150000')
+
+def verify_password(hashed_password, password):
+    """Verify a password against a hash made by hash_password"""
+    ph = get_password_hasher()
+    if ph:
         try:
             return ph.verify(hashed_password, password)
         except:
             return False
-            
-    logging.info("Using Argon2 for password hashing")
-except ImportError:
-    # Fallback to Werkzeug's generate_password_hash which uses pbkdf2:sha256
-    def hash_password(password):
-        """Hash a password using pbkdf2:sha256"""
-        return generate_password_hash(password, method='pbkdf2:sha256:150000')
-    
-    def verify_password(hashed_password, password):
-        """Verify a password against a hash using pbkdf2:sha256"""
-        return check_password_hash(hashed_password, password)
-        
-    logging.info("Using pbkdf2:sha256 for password hashing (Argon2 not available)")
+    return check_password_hash(hashed_password, password)
 
 # Generate a secure token for API operations
 def generate_secure_token(length=32):
     """Generate a cryptographically secure token"""
     return secrets.token_hex(length)
 
-# Create Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
+# Shared Supabase client of the worker (the SDK is imported on first use)
+supabase = get_supabase_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Shared async gateway of the worker, for calls that can run concurrently
+gateway = get_async_gateway(SUPABASE_URL, SUPABASE_KEY)
 
 class SupabaseAuth:
     """Enhanced Supabase authentication wrapper with improved error handling"""
@@ -125,7 +132,7 @@ class SupabaseAuth:
     @staticmethod
     def login(email, password):
         """Log in a user with Supabase Auth with enhanced security"""
-        if not supabase:
+        if not supabase or not gateway:
             raise Exception("Supabase client not initialized")
             
         try:
@@ -139,23 +146,23 @@ class SupabaseAuth:
             if not auth_response.user:
                 raise Exception("Login failed")
                 
-            # Get user profile
+            # Get user profile, as the user
             user_id = auth_response.user.id
-            user_response = supabase.table('users').select('*').eq('id', user_id).execute()
+            access_token = auth_response.session.access_token
+            profile = gateway.run(gateway.select('users', {'id': user_id}, access_token))
             
             # If user exists in Auth but not in users table, something is wrong
-            if not user_response.data:
+            if not profile:
                 raise Exception("User profile not found. Database may need to be set up.")
                 
-            user_data = user_response.data[0]
+            user_data = profile[0]
             
-            # Update last login time and IP
+            # Update last login time and IP now that the profile is known to exist
             try:
-                login_data = {
+                gateway.run(gateway.update('users', {
                     "last_login": datetime.now().isoformat(),
                     "last_login_ip": request.remote_addr if 'request' in globals() else None
-                }
-                supabase.table('users').update(login_data).eq('id', user_id).execute()
+                }, {'id': user_id}, access_token))
             except Exception as update_error:
                 logging.warning(f"Could not update last login info: {str(update_error)}")
                 # Continue anyway as the login was successful
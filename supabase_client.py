@@ -1,7 +1,8 @@
 import os
 import json
 import logging
-from supabase import create_client
+from supabase_lazy import get_supabase_client
+from supabase_async import get_async_gateway
 from models import User, Plant, Condition, ConditionType, PlantStage, PlantType
 from datetime import datetime
 
@@ -12,8 +13,11 @@ SUPABASE_KEY = os.environ.get("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXV
 logging.info("Using Supabase URL: %s", SUPABASE_URL)
 logging.info("Supabase key is configured")
 
-# Create Supabase client
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
+# Shared Supabase client of the worker (the SDK is imported on first use)
+supabase = get_supabase_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Shared async gateway of the worker, for calls that can run concurrently
+gateway = get_async_gateway(SUPABASE_URL, SUPABASE_KEY)
 
 def convert_to_dict(obj):
     """Convert an object to a dictionary, handling enum types"""
@@ -56,7 +60,8 @@ def create_user(email, password, username):
             
             # Create default condition types for the user
             try:
-                create_default_condition_types(user_id)
+                session = auth_response.session
+                create_default_condition_types(user_id, session.access_token if session else None)
             except Exception as e:
                 logging.warning(f"Failed to create default condition types: {str(e)}")
                 
@@ -216,8 +221,12 @@ def update_plant(plant):
         return False
 
 # Condition functions
-def log_condition(user_id, type_name, value):
-    """Log a condition for a user"""
+def log_condition(user_id, type_name, value, access_token=None):
+    """Log a condition for a user
+    
+    The user's access token is needed for the condition to reach their
+    plants, see apply_condition_to_plants().
+    """
     try:
         condition_data = {
             'user_id': user_id,
@@ -231,7 +240,7 @@ def log_condition(user_id, type_name, value):
             condition_id = response.data[0]['id']
             
             # Apply condition to plants
-            apply_condition_to_plants(user_id, type_name, value)
+            apply_condition_to_plants(user_id, type_name, value, access_token)
             
             return Condition(
                 condition_id,
@@ -264,8 +273,13 @@ def get_conditions_by_user_id(user_id, limit=10):
         return []
 
 # ConditionType functions
-def create_default_condition_types(user_id):
-    """Create default condition types for a new user"""
+def create_default_condition_types(user_id, access_token=None):
+    """Create default condition types for a new user
+
+    Args:
+        user_id: The new user's ID
+        access_token: The new user's access token, if sign up signed them in
+    """
     default_conditions = [
         {
             'name': 'water_intake',
@@ -299,17 +313,22 @@ def create_default_condition_types(user_id):
         }
     ]
     
+    if not gateway:
+        logging.error("Failed to create default condition types: Supabase is not configured")
+        return
+
+    # Insert them all with one request
     try:
-        for condition in default_conditions:
-            condition_data = {
+        gateway.run(gateway.insert('condition_types', [
+            {
                 'name': condition['name'],
                 'description': condition['description'],
                 'unit': condition['unit'],
                 'default_goal': condition['default_goal'],
                 'user_id': None  # System-defined condition
             }
-            
-            supabase.table('condition_types').insert(condition_data).execute()
+            for condition in default_conditions
+        ], access_token))
     except Exception as e:
         logging.error(f"Failed to create default condition types: {str(e)}")
 
@@ -363,63 +382,24 @@ def create_custom_condition_type(user_id, name, description, unit, default_goal)
         return None
 
 # Plant growth logic
-def apply_condition_to_plants(user_id, condition_type, value):
-    """Apply a logged condition to all plants of the user"""
+def apply_condition_to_plants(user_id, condition_type, value, access_token=None):
+    """Apply a logged condition to all plants of the user
+    
+    The apply_condition_effect function (see supabase_setup.sql) computes the
+    effect and applies it to every plant in a single call, however many
+    plants the user has. It only runs for a signed in user on their own
+    plants, so the call is made with the user's access token.
+    
+    Returns:
+        Number of plants updated, or None if the call failed
+    """
     try:
-        plants = get_plants_by_user_id(user_id)
-        
-        for plant in plants:
-            # Calculate effect on health and progress based on condition type and value
-            health_change, progress_change = calculate_condition_effect(condition_type, value)
-            
-            # Update plant health
-            plant.health = min(100, max(0, plant.health + health_change))
-            
-            # Update plant progress and potentially advance stage
-            plant.progress += progress_change
-            
-            # Check if plant should advance to next stage
-            if plant.progress >= 100 and plant.stage.value < PlantStage.DEAD.value:
-                plant.progress = 0
-                plant.stage = PlantStage(min(PlantStage.DEAD.value, plant.stage.value + 1))
-            
-            # Update last_watered time for water_intake condition
-            if condition_type == 'water_intake':
-                plant.last_watered = datetime.now()
-            
-            # Save the updated plant
-            update_plant(plant)
+        result = gateway.run(gateway.request('POST', "/rest/v1/rpc/apply_condition_effect", access_token, json={
+            'p_user_id': user_id,
+            'p_condition_type': condition_type,
+            'p_value': value
+        }))
+        return (result or {}).get('affected_plants', 0)
     except Exception as e:
         logging.error(f"Failed to apply condition to plants: {str(e)}")
-
-def calculate_condition_effect(condition_type, value):
-    """Calculate the effect of a condition on plant health and progress"""
-    # Default changes
-    health_change = 0
-    progress_change = 0
-    
-    # Adjust based on condition type and value
-    if condition_type == 'water_intake':
-        health_change = min(10, value) - 4  # Penalty for < 4 glasses, bonus for > 4 glasses
-        progress_change = value / 2
-    elif condition_type == 'focus_time':
-        health_change = min(value / 30, 10)  # Max health gain of 10 for focus time
-        progress_change = value / 30
-    elif condition_type == 'sunlight':
-        health_change = min(value / 10, 15)  # Max health gain of 15 for sunlight
-        progress_change = value / 10
-    elif condition_type == 'exercise':
-        health_change = min(value / 10, 10)  # Max health gain of 10 for exercise
-        progress_change = value / 10
-    elif condition_type == 'sleep':
-        if value < 6:
-            health_change = -5  # Penalty for under 6 hours
-        else:
-            health_change = min((value - 6) * 3, 10)  # Max health gain of 10 for sleep > 6 hours
-        progress_change = max(0, value - 5) * 3
-    else:
-        # Generic calculation for custom conditions
-        health_change = value / 10
-        progress_change = value / 10
-    
-    return health_change, progress_change
+        return None
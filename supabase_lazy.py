@@ -0,0 +1,118 @@
+import logging
+import os
+import threading
+
+# Connections the async gateway keeps open to Supabase per worker process
+DEFAULT_POOL_SIZE = 10
+
+# Seconds to wait for a Supabase request, and for a new connection
+DEFAULT_TIMEOUT = 20
+DEFAULT_CONNECT_TIMEOUT = 5
+
+# Seconds an idle pooled connection is kept open
+DEFAULT_KEEPALIVE_EXPIRY = 60
+
+def pool_settings():
+    """Get the connection limits and timeouts of the async gateway from the environment
+
+    SUPABASE_POOL_SIZE, SUPABASE_TIMEOUT, SUPABASE_CONNECT_TIMEOUT and
+    SUPABASE_KEEPALIVE_EXPIRY configure the pooled keep-alive HTTP client of
+    supabase_async.AsyncSupabaseGateway.
+
+    Returns:
+        (httpx.Limits, httpx.Timeout, request timeout in seconds)
+    """
+    import httpx
+
+    pool_size = int(os.environ.get('SUPABASE_POOL_SIZE', DEFAULT_POOL_SIZE))
+    timeout = float(os.environ.get('SUPABASE_TIMEOUT', DEFAULT_TIMEOUT))
+    connect_timeout = float(os.environ.get('SUPABASE_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT))
+    keepalive_expiry = float(os.environ.get('SUPABASE_KEEPALIVE_EXPIRY', DEFAULT_KEEPALIVE_EXPIRY))
+
+    limits = httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=keepalive_expiry
+    )
+    return limits, httpx.Timeout(timeout, connect=connect_timeout), timeout
+
+def client_options():
+    """Build the options of the shared sync clients from the environment
+
+    The sync SDK client keeps a keep-alive session per service itself, so
+    only SUPABASE_TIMEOUT applies to it; the pool settings are used by the
+    async gateway. Returns None for SDK versions without client options.
+    """
+    try:
+        from supabase.lib import client_options as options
+    except ImportError:
+        return None
+
+    # Named SyncClientOptions since supabase 2.x, ClientOptions before
+    options_class = getattr(options, 'SyncClientOptions', None) or getattr(options, 'ClientOptions', None)
+    if options_class is None:
+        return None
+
+    timeout = float(os.environ.get('SUPABASE_TIMEOUT', DEFAULT_TIMEOUT))
+    return options_class(postgrest_client_timeout=timeout, storage_client_timeout=timeout)
+
+class LazySupabaseClient:
+    """Stands in for a Supabase client until it is first used
+
+    The supabase SDK is only imported, and the client only created, on the
+    first attribute access, so deployments that never call Supabase don't
+    pay for it in startup time or memory. Import and connection errors are
+    raised from that first access, where callers already handle them.
+
+    The client is created again in a worker forked from a process that
+    already used it, so workers never share pooled connections.
+    """
+
+    def __init__(self, url, key):
+        self._url = url
+        self._key = key
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def get_client(self):
+        if self._client is None or self._pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._pid != os.getpid():
+                    from supabase import create_client
+                    options = client_options()
+                    if options is None:
+                        self._client = create_client(self._url, self._key)
+                    else:
+                        self._client = create_client(self._url, self._key, options=options)
+                    self._pid = os.getpid()
+                    logging.debug("Created Supabase client")
+        return self._client
+
+    def __getattr__(self, name):
+        # Only called for attributes the facade itself doesn't have
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get_client(), name)
+
+# Shared clients by (url, key)
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_supabase_client(url=None, key=None):
+    """Get the shared Supabase client for a project, or None if Supabase isn't configured
+
+    Every call site gets the same thread-safe client for the same URL and
+    key (SUPABASE_URL and SUPABASE_KEY by default), so its connections are
+    reused across requests instead of opening new ones each time.
+    """
+    url = url or os.environ.get('SUPABASE_URL')
+    key = key or os.environ.get('SUPABASE_KEY')
+    if not url or not key:
+        return None
+
+    with _clients_lock:
+        client = _clients.get((url, key))
+        if client is None:
+            client = _clients[(url, key)] = LazySupabaseClient(url, key)
+        return client
@@ -6,7 +6,7 @@ This script runs the SQL setup commands against the Supabase database.
 import os
 import logging
 import time
-from supabase import create_client
+from supabase_lazy import get_supabase_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -70,7 +70,7 @@ def execute_sql_setup():
     
     # Create Supabase client with service role key for admin operations
     try:
-        supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+        supabase = get_supabase_client(SUPABASE_URL, SUPABASE_SERVICE_KEY).get_client()
         logging.info("Successfully connected to Supabase")
     except Exception as e:
         logging.error(f"Failed to connect to Supabase: {str(e)}")
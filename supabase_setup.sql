@@ -259,88 +259,61 @@ END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
 -- Create function to apply condition effects
-CREATE OR REPLACE FUNCTION public.apply_condition_effect(p_user_id UUID, p_condition_type TEXT, p_value FLOAT)
+-- The effect is computed here, the same way as calculate_condition_effect in
+-- routes.py, and only for the signed in user's own plants. The older versions
+-- taking an effect or any user's id from the caller are replaced.
+DROP FUNCTION IF EXISTS public.apply_condition_effect(UUID, TEXT, FLOAT);
+DROP FUNCTION IF EXISTS public.apply_condition_effect(UUID, TEXT, FLOAT, FLOAT, FLOAT);
+CREATE OR REPLACE FUNCTION public.apply_condition_effect(
+    p_user_id UUID,
+    p_condition_type TEXT,
+    p_value FLOAT
+)
 RETURNS JSONB AS $$
 DECLARE
     v_effect_health FLOAT := 0;
     v_effect_progress FLOAT := 0;
-    v_goal FLOAT;
     v_result JSONB;
     v_affected_plants INTEGER := 0;
 BEGIN
-    -- Get the default goal for this condition type
-    SELECT default_goal INTO v_goal
-    FROM public.condition_types
-    WHERE name = p_condition_type
-    AND (user_id = p_user_id OR user_id IS NULL)
-    ORDER BY user_id NULLS LAST -- Prefer user-defined goals
-    LIMIT 1;
+    -- Only the signed in user's plants can be changed
+    IF auth.uid() IS NULL OR p_user_id <> auth.uid() THEN
+        RAISE EXCEPTION 'Not allowed to apply conditions for this user'
+            USING ERRCODE = '42501';
+    END IF;
     
     -- Calculate the effect based on condition type and value
-    IF p_condition_type = 'Water Intake' THEN
-        -- Water intake improves health
-        v_effect_health := CASE
-            WHEN v_goal IS NOT NULL THEN (p_value / v_goal) * 5
-            ELSE p_value * 0.5
-        END;
-        v_effect_progress := v_effect_health * 0.5;
-    ELSIF p_condition_type = 'Sleep' THEN
-        -- Sleep improves health
-        v_effect_health := CASE
-            WHEN v_goal IS NOT NULL THEN (p_value / v_goal) * 7
-            ELSE p_value * 0.8
-        END;
-        v_effect_progress := v_effect_health * 0.3;
-    ELSIF p_condition_type = 'Exercise' THEN
-        -- Exercise improves progress
-        v_effect_progress := CASE
-            WHEN v_goal IS NOT NULL THEN (p_value / v_goal) * 6
-            ELSE p_value * 0.1
-        END;
-        v_effect_health := v_effect_progress * 0.5;
-    ELSIF p_condition_type = 'Meditation' THEN
-        -- Meditation improves health
+    IF p_condition_type = 'water_intake' THEN
+        -- Penalty for < 4 glasses, bonus for > 4 glasses
+        v_effect_health := LEAST(10, p_value) - 4;
+        v_effect_progress := p_value / 2;
+    ELSIF p_condition_type = 'focus_time' THEN
+        v_effect_health := LEAST(p_value / 30, 10);
+        v_effect_progress := p_value / 30;
+    ELSIF p_condition_type = 'sunlight' THEN
+        v_effect_health := LEAST(p_value / 10, 15);
+        v_effect_progress := p_value / 10;
+    ELSIF p_condition_type = 'exercise' THEN
+        v_effect_health := LEAST(p_value / 10, 10);
+        v_effect_progress := p_value / 10;
+    ELSIF p_condition_type = 'sleep' THEN
+        -- Penalty for under 6 hours, max health gain of 10 above that
         v_effect_health := CASE
-            WHEN v_goal IS NOT NULL THEN (p_value / v_goal) * 4
-            ELSE p_value * 0.2
+            WHEN p_value < 6 THEN -5
+            ELSE LEAST((p_value - 6) * 3, 10)
         END;
-        v_effect_progress := v_effect_health * 0.7;
-    ELSIF p_condition_type = 'Reading' THEN
-        -- Reading improves progress
-        v_effect_progress := CASE
-            WHEN v_goal IS NOT NULL THEN (p_value / v_goal) * 5
-            ELSE p_value * 0.1
-        END;
-        v_effect_health := v_effect_progress * 0.3;
-    ELSIF p_condition_type = 'Sunlight' THEN
-        -- Sunlight improves both
-        v_effect_health := CASE
-            WHEN v_goal IS NOT NULL THEN (p_value / v_goal) * 5
-            ELSE p_value * 0.2
-        END;
-        v_effect_progress := v_effect_health;
-    ELSIF p_condition_type = 'Deep Work' THEN
-        -- Deep work improves progress
-        v_effect_progress := CASE
-            WHEN v_goal IS NOT NULL THEN (p_value / v_goal) * 8
-            ELSE p_value * 0.05
-        END;
-        v_effect_health := v_effect_progress * 0.2;
+        v_effect_progress := GREATEST(0, p_value - 5) * 3;
     ELSE
         -- Generic effect for custom conditions
-        v_effect_health := CASE
-            WHEN v_goal IS NOT NULL THEN (p_value / v_goal) * 3
-            ELSE p_value * 0.1
-        END;
-        v_effect_progress := v_effect_health;
+        v_effect_health := p_value / 10;
+        v_effect_progress := p_value / 10;
     END IF;
     
     -- Apply the effect to all plants of the user
     WITH updated_plants AS (
         UPDATE public.plants
         SET 
-            health = LEAST(health + v_effect_health, 100),
-            progress = progress + v_effect_progress,
+            health = LEAST(GREATEST(health + v_effect_health, 0), 100),
             -- If progress reaches 100, advance stage and reset progress
             stage = CASE 
                 WHEN progress + v_effect_progress >= 100 AND stage < 6 
@@ -351,6 +324,11 @@ BEGIN
                 WHEN progress + v_effect_progress >= 100 AND stage < 6 
                 THEN 0 
                 ELSE LEAST(progress + v_effect_progress, 100) 
+            END,
+            last_watered = CASE
+                WHEN p_condition_type = 'water_intake'
+                THEN now()
+                ELSE last_watered
             END
         WHERE user_id = p_user_id
         RETURNING *
@@ -368,7 +346,11 @@ BEGIN
     
     RETURN v_result;
 END;
-$$ LANGUAGE plpgsql SECURITY DEFINER;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Signed in users only
+REVOKE EXECUTE ON FUNCTION public.apply_condition_effect(UUID, TEXT, FLOAT) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.apply_condition_effect(UUID, TEXT, FLOAT) TO authenticated;
 
 -- Create stored procedure for daily update of plants
 CREATE OR REPLACE PROCEDURE public.update_plants_daily()
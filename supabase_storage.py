@@ -1,7 +1,8 @@
 import os
 import logging
 import uuid
-from supabase import create_client, Client
+from supabase_lazy import get_supabase_client
+from supabase_async import get_async_gateway
 
 # Initialize Supabase client
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
@@ -10,8 +11,11 @@ SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 if not SUPABASE_URL or not SUPABASE_KEY:
     logging.warning("Supabase credentials not found in environment variables")
 
-# Create Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
+# Shared Supabase client of the worker (the SDK is imported on first use)
+supabase = get_supabase_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Shared async gateway of the worker, for calls that can run concurrently
+gateway = get_async_gateway(SUPABASE_URL, SUPABASE_KEY)
 
 # Default bucket name
 DEFAULT_BUCKET = "pixelsprout-uploads"
@@ -19,10 +23,21 @@ DEFAULT_BUCKET = "pixelsprout-uploads"
 class SupabaseStorage:
     """Supabase storage wrapper for file uploads"""
     
+    # Set once the buckets have been checked by this process
+    _buckets_checked = False
+    
+    @staticmethod
+    def ensure_buckets():
+        """Check the storage buckets once per process, on first use"""
+        if SupabaseStorage._buckets_checked:
+            return
+        SupabaseStorage.initialize_buckets()
+        SupabaseStorage._buckets_checked = True
+    
     @staticmethod
     def initialize_buckets():
         """Check if required storage buckets exist and are accessible"""
-        if not supabase:
+        if not supabase or not gateway:
             raise Exception("Supabase client not initialized")
             
         try:
@@ -31,7 +46,7 @@ class SupabaseStorage:
             
             # Try to list existing buckets
             try:
-                buckets = supabase.storage.list_buckets()
+                buckets = gateway.run(gateway.list_buckets())
                 bucket_names = [bucket["name"] for bucket in buckets]
                 
                 # Log which buckets exist
@@ -41,26 +56,32 @@ class SupabaseStorage:
                     else:
                         logging.warning(f"Storage bucket does not exist: {bucket}")
                         
-                # If we can list buckets but some are missing, try to create them
-                for bucket in required_buckets:
-                    if bucket not in bucket_names:
-                        try:
-                            supabase.storage.create_bucket(id=bucket, options={"public": True})
-                            logging.info(f"Created storage bucket: {bucket}")
-                        except Exception as bucket_error:
-                            logging.warning(f"Could not create bucket {bucket}: {str(bucket_error)}")
+                # If we can list buckets but some are missing, try to create them concurrently
+                missing_buckets = [bucket for bucket in required_buckets if bucket not in bucket_names]
+                results = gateway.gather(
+                    *(gateway.create_bucket(bucket, public=True) for bucket in missing_buckets),
+                    return_exceptions=True
+                )
+                for bucket, result in zip(missing_buckets, results):
+                    if isinstance(result, Exception):
+                        logging.warning(f"Could not create bucket {bucket}: {str(result)}")
+                    else:
+                        logging.info(f"Created storage bucket: {bucket}")
                 
             except Exception as list_error:
                 # If we can't list buckets, try to access each required bucket directly
                 logging.warning(f"Could not list buckets: {str(list_error)}")
                 
-                for bucket in required_buckets:
-                    try:
-                        # Try to list files in the bucket to check if it exists and is accessible
-                        supabase.storage.from_(bucket).list()
+                # Try to list files in the buckets to check if they exist and are accessible
+                results = gateway.gather(
+                    *(gateway.list_files(bucket) for bucket in required_buckets),
+                    return_exceptions=True
+                )
+                for bucket, result in zip(required_buckets, results):
+                    if isinstance(result, Exception):
+                        logging.warning(f"Storage bucket is not accessible: {bucket}. Error: {str(result)}")
+                    else:
                         logging.info(f"Storage bucket is accessible: {bucket}")
-                    except Exception as access_error:
-                        logging.warning(f"Storage bucket is not accessible: {bucket}. Error: {str(access_error)}")
             
             # Return success even if we couldn't create all buckets
             # The application will handle missing buckets gracefully
@@ -88,6 +109,9 @@ class SupabaseStorage:
         if not supabase:
             return {"success": False, "error": "Supabase client not initialized"}
             
+        # Make sure the buckets exist before the first upload of this process
+        SupabaseStorage.ensure_buckets()
+            
         try:
             # Generate a unique file name if not provided
             if not file_name:
@@ -0,0 +1,155 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, request, session
+from flask_login import current_user
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+
+# Rendered pages and fragments kept per worker before the least recently used are evicted
+MAX_CACHE_ENTRIES = 1024
+
+# Seconds a rendered anonymous page or per-user fragment is reused
+DEFAULT_PAGE_TIMEOUT = 300
+DEFAULT_FRAGMENT_TIMEOUT = 300
+
+class RenderCache:
+    """Rendered HTML kept in the memory of the current worker process"""
+
+    def __init__(self, max_entries=MAX_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, html = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return html
+
+    def set(self, key, html, timeout):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, html)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Shared cache for the worker process
+render_cache = RenderCache()
+
+def cache_enabled():
+    return current_app.config.get('TEMPLATE_CACHE_ENABLED', True)
+
+def cache_anonymous_page(timeout=DEFAULT_PAGE_TIMEOUT):
+    """Cache the rendered HTML of a view for anonymous visitors
+
+    Every anonymous visitor gets the same page, so it is rendered once per
+    worker and timeout. Logged in users always get a fresh render. Only the
+    HTML is cached, response headers and cookies are still set per request.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not cache_enabled() or current_user.is_authenticated or session.get('user_id'):
+                return f(*args, **kwargs)
+
+            key = ('page', request.path)
+            html = render_cache.get(key)
+            if html is None:
+                html = f(*args, **kwargs)
+                # Redirects and other responses are never cached
+                if not isinstance(html, str):
+                    return html
+                render_cache.set(key, html, timeout)
+            return html
+        return decorated_function
+    return decorator
+
+def garden_version(user):
+    """Get a short hash that changes whenever the user's garden changes
+
+    Computed from one aggregate query so it is the same in every worker.
+    The result is kept on g for the rest of the request.
+    """
+    if 'garden_version' in g:
+        return g.garden_version
+
+    from app import db
+    from models import Plant, Condition
+
+    latest_condition = db.session.query(db.func.max(Condition.id)).filter(
+        Condition.user_id == user.id
+    ).scalar_subquery()
+    row = db.session.query(
+        db.func.count(Plant.id),
+        db.func.max(Plant.last_watered),
+        db.func.sum(Plant.progress),
+        db.func.sum(Plant.health),
+        db.func.sum(Plant.stage),
+        latest_condition
+    ).filter(Plant.user_id == user.id).one()
+
+    state = repr((user.username, user.water_credits, user.garden_score) + tuple(row))
+    g.garden_version = hashlib.sha1(state.encode('utf-8')).hexdigest()[:16]
+    return g.garden_version
+
+def cached_fragment(name, timeout=DEFAULT_FRAGMENT_TIMEOUT, caller=None):
+    """Cache a per-user template fragment until the user's garden changes
+
+    Used from templates with a call block:
+
+        {% call cached_fragment('profile') %}...{% endcall %}
+    """
+    if not cache_enabled() or not current_user.is_authenticated:
+        return caller()
+
+    try:
+        key = ('fragment', name, current_user.id, garden_version(current_user))
+    except Exception as e:
+        logging.error(f"Error computing garden version for fragment cache: {str(e)}")
+        return caller()
+
+    html = render_cache.get(key)
+    if html is None:
+        html = Markup(caller())
+        render_cache.set(key, html, timeout)
+    return html
+
+def init_template_cache(app):
+    """Set up the page and fragment caches and the Jinja bytecode cache
+
+    Compiled templates are stored in TEMPLATE_BYTECODE_CACHE_DIR (a directory
+    in the system temp dir by default) so new workers skip compiling them.
+    TEMPLATE_CACHE_ENABLED turns off page and fragment caching, which is the
+    default in debug mode so template edits show up immediately.
+    """
+    app.config.setdefault('TEMPLATE_CACHE_ENABLED', not app.debug)
+    app.config.setdefault(
+        'TEMPLATE_BYTECODE_CACHE_DIR',
+        os.environ.get('TEMPLATE_BYTECODE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'pixelsprout-jinja'))
+    )
+
+    bytecode_dir = app.config['TEMPLATE_BYTECODE_CACHE_DIR']
+    try:
+        os.makedirs(bytecode_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(bytecode_dir)
+    except OSError as e:
+        logging.warning(f"Jinja bytecode cache disabled: {str(e)}")
+
+    app.jinja_env.globals['cached_fragment'] = cached_fragment
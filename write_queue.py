@@ -0,0 +1,236 @@
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from flask import g, has_request_context, jsonify
+from db_routing import holds_connection, pin_to_primary
+from query_tracker import env_flag
+
+# Most write intents applied in one transaction
+DEFAULT_MAX_BATCH = 64
+
+# Milliseconds the writer waits for more intents once it has one
+DEFAULT_MAX_WAIT_MS = 2
+
+# Seconds a request waits for its write before giving up
+DEFAULT_TIMEOUT = 30
+
+class WriteTimeout(Exception):
+    """A queued write didn't finish within WRITE_QUEUE_TIMEOUT
+
+    pending is True if the writer had already started it, so it will still
+    be committed (or fail) later, and False if it was cancelled and will
+    never be applied.
+    """
+
+    def __init__(self, pending):
+        super().__init__("Write is still being applied" if pending else "Write was cancelled before it was applied")
+        self.pending = pending
+
+class WriteIntent:
+    __slots__ = ('fn', 'args', 'future', 'callbacks')
+
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = args
+        self.future = Future()
+        self.callbacks = []
+
+# Callbacks registered by the intent that is currently running on this thread
+_current = threading.local()
+
+def on_commit(callback, *args):
+    """Run callback(*args) once the current write has been committed
+
+    Used for side effects like publishing garden events, which must not
+    happen for writes that end up rolled back.
+    """
+    _current.intent.callbacks.append((callback, args))
+
+def run_callbacks(intent):
+    for callback, args in intent.callbacks:
+        try:
+            callback(*args)
+        except Exception as e:
+            logging.error(f"Error in write commit callback: {str(e)}")
+
+class GroupCommitWriter:
+    """Applies write intents from a queue on one thread, many per transaction
+
+    Each intent runs in its own savepoint, so a failing intent is rolled
+    back on its own, and the whole batch is committed once. With SQLite
+    that means one write lock and one WAL sync per batch instead of one per
+    request, so throughput grows with the batch size.
+    """
+
+    def __init__(self, app, db, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT_MS / 1000):
+        self.app = app
+        self.db = db
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, timeout=DEFAULT_TIMEOUT):
+        """Queue fn(*args) and wait for its result once it is committed
+
+        Raises WriteTimeout if it isn't committed within timeout seconds. An
+        intent the writer hasn't started by then is cancelled.
+        """
+        self.ensure_started()
+        intent = WriteIntent(fn, args)
+        self._queue.put(intent)
+        try:
+            return intent.future.result(timeout)
+        except FutureTimeoutError:
+            if intent.future.cancel():
+                raise WriteTimeout(pending=False)
+            if not intent.future.done():
+                raise WriteTimeout(pending=True)
+            # Finished just after the timeout
+            return intent.future.result()
+
+    def ensure_started(self):
+        # Started on first use, and again in a worker forked from a preloaded parent
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self.run, name='group-commit-writer', daemon=True)
+                self._thread.start()
+
+    def next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get(timeout=self.max_wait))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            try:
+                with self.app.app_context():
+                    self.apply_batch(batch)
+            except Exception as e:
+                logging.error(f"Group commit of {len(batch)} writes failed: {str(e)}")
+                for intent in batch:
+                    if not intent.future.done():
+                        intent.future.set_exception(e)
+
+    def apply_batch(self, batch):
+        session = self.db.session()
+        # Objects stay loaded after the commit for the commit callbacks
+        session.expire_on_commit = False
+        pin_to_primary(session)
+
+        applied = []
+        try:
+            for intent in batch:
+                # Skip intents whose request gave up waiting for them
+                if not intent.future.set_running_or_notify_cancel():
+                    continue
+                _current.intent = intent
+                try:
+                    with session.begin_nested():
+                        result = intent.fn(*intent.args)
+                    applied.append((intent, result))
+                except Exception as e:
+                    intent.future.set_exception(e)
+                finally:
+                    _current.intent = None
+
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self.db.session.remove()
+
+        for intent, result in applied:
+            run_callbacks(intent)
+            intent.future.set_result(result)
+
+        logging.debug("Group committed %s writes", len(applied))
+
+_writer = None
+
+def submit_write(fn, *args):
+    """Apply a write intent and return its result once it is committed
+
+    fn(*args) makes its changes in db.session without committing and
+    returns the response data, registering side effects with on_commit().
+    With the write queue enabled it runs on the group-commit writer thread,
+    otherwise it runs and commits right here. It also runs here when this
+    session already holds a write connection, which the writer would
+    otherwise wait for (the SQLite write pool has one connection).
+    """
+    from app import app, db
+
+    # Keeps this client reading from the primary for a moment (see db_routing)
+    if has_request_context():
+        g.db_wrote = True
+
+    queued = _writer is not None and app.config['WRITE_QUEUE_ENABLED']
+    if queued and not holds_connection(db.session(), db.engine):
+        return _writer.submit(fn, *args, timeout=app.config['WRITE_QUEUE_TIMEOUT'])
+
+    intent = WriteIntent(fn, args)
+    _current.intent = intent
+    # Read the rows being updated through the write engine too
+    pin_to_primary(db.session())
+    try:
+        result = fn(*args)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        _current.intent = None
+    run_callbacks(intent)
+    return result
+
+def write_timeout_response(error):
+    """Respond to a WriteTimeout so the client never applies a write twice
+
+    A write still being applied is reported as accepted (202), its changes
+    reach the garden page through the event stream. A cancelled one is
+    reported as unavailable (503), so the client can safely retry it.
+    """
+    if error.pending:
+        return jsonify({
+            'success': True,
+            'pending': True,
+            'message': 'Your change is still being saved and will show up shortly'
+        }), 202
+
+    response = jsonify({'success': False, 'message': 'The server is busy, please try again in a moment'})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+def init_write_queue(app, db):
+    """Set up the optional group-commit writer
+
+    On by default in SQLite mode, set WRITE_QUEUE_ENABLED to override.
+    WRITE_QUEUE_MAX_BATCH and WRITE_QUEUE_MAX_WAIT_MS tune the batching.
+    The writer thread is only started by the first write.
+    """
+    global _writer
+    app.config.setdefault('WRITE_QUEUE_ENABLED', env_flag('WRITE_QUEUE_ENABLED', bool(app.config.get('SQLITE_MODE'))))
+    app.config.setdefault('WRITE_QUEUE_TIMEOUT', float(os.environ.get('WRITE_QUEUE_TIMEOUT', DEFAULT_TIMEOUT)))
+
+    if app.config['WRITE_QUEUE_ENABLED']:
+        _writer = GroupCommitWriter(
+            app,
+            db,
+            max_batch=int(os.environ.get('WRITE_QUEUE_MAX_BATCH', DEFAULT_MAX_BATCH)),
+            max_wait=float(os.environ.get('WRITE_QUEUE_MAX_WAIT_MS', DEFAULT_MAX_WAIT_MS)) / 1000
+        )